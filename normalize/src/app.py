@@ -1,25 +1,32 @@
 import os
 import asyncio
-from typing import Dict, Any
+import logging
+from typing import Dict, Any, List, Optional
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import ValidationError
+import httpx
 import uvicorn
 from dotenv import load_dotenv
 
-from .models import NormalizeIn, NormalizeOut, Contact, Entity, Enrichment
-from .logic.categorizer import categorize
-from .logic.extract_contact import extract_contact
-from .logic.extract_entities import extract_entities
+from .models import NormalizeIn, NormalizeBatchIn, NormalizeOut, Contact, Entity, Enrichment
+from .logic.batcher import LLMBatcher
+from .logic.llm_combined import MAX_BATCH_SIZE, classify_and_extract, classify_and_extract_many
+from .logic.extract_entities import (
+    extract_entities, load_entity_cache, load_geocode_cache, save_entity_cache, save_geocode_cache
+)
 from .logic.enrich import enrich
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title="Normalize Bot API",
     description="Production-ready normalization API for travel messages",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Environment variables
@@ -27,8 +34,62 @@ PORT = int(os.getenv("PORT", 8080))
 GEOCODER_BASE_URL = os.getenv("GEOCODER_BASE_URL", "https://nominatim.openstreetmap.org")
 EMERGENCY_API_BASE = os.getenv("EMERGENCY_API_BASE", "https://emergencynumberapi.com/api")
 HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "1.0"))
-MAX_RETRIES = int(os.getenv("MAX_RETRIES", "2"))
 USER_AGENT = os.getenv("USER_AGENT", "normalize-bot/1.0 (contact@example.com)")
+# Micro-batching of LLM classification across concurrent requests; 1 disables it.
+# Clamped to MAX_BATCH_SIZE, past which a batched call outgrows its token limit and timeout
+LLM_BATCH_SIZE = max(1, min(int(os.getenv("LLM_BATCH_SIZE", "1")), MAX_BATCH_SIZE))
+LLM_BATCH_WAIT_SECONDS = float(os.getenv("LLM_BATCH_WAIT_SECONDS", "0.02"))
+# Optional JSON files the entity extraction and geocoding caches are loaded from
+# on startup and saved to on shutdown
+ENTITY_CACHE_PATH = os.getenv("ENTITY_CACHE_PATH")
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH")
+
+
+@app.on_event("startup")
+async def startup():
+    """Create the shared outbound HTTP client (pooled across requests) and the LLM batcher if enabled."""
+    if ENTITY_CACHE_PATH:
+        load_entity_cache(ENTITY_CACHE_PATH)
+    if GEOCODE_CACHE_PATH:
+        load_geocode_cache(GEOCODE_CACHE_PATH)
+
+    # HTTP/2 multiplexes concurrent calls to the same host over one connection.
+    # The transport retries failed connection attempts once, so a connect
+    # timeout under load doesn't immediately push a request onto a fallback path
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        retries=1
+    )
+    app.state.http = httpx.AsyncClient(
+        transport=transport,
+        timeout=HTTP_TIMEOUT_SECONDS,
+        headers={"User-Agent": USER_AGENT}
+    )
+
+    app.state.llm_batcher = None
+    if LLM_BATCH_SIZE > 1:
+        app.state.llm_batcher = LLMBatcher(
+            lambda texts: classify_and_extract_many(texts, app.state.http),
+            max_batch_size=LLM_BATCH_SIZE,
+            max_wait=LLM_BATCH_WAIT_SECONDS
+        )
+        app.state.llm_batcher.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop the LLM batcher, close the shared outbound HTTP client and save the on-disk caches."""
+    if app.state.llm_batcher:
+        await app.state.llm_batcher.stop()
+    await app.state.http.aclose()
+
+    for path, save in ((ENTITY_CACHE_PATH, save_entity_cache), (GEOCODE_CACHE_PATH, save_geocode_cache)):
+        if path:
+            try:
+                save(path)
+            except OSError as e:
+                logger.warning("Could not save cache to %s: %s", path, e)
 
 
 @app.get("/healthz")
@@ -38,43 +99,80 @@ async def health_check():
 
 
 @app.post("/normalize")
-async def normalize_message(request: NormalizeIn) -> NormalizeOut:
+async def normalize_message(request: NormalizeIn, http_request: Request) -> NormalizeOut:
     """
     Normalize a travel message by extracting contact info, entities, and enrichment data.
     """
-    try:
-        # Extract contact information (now async)
-        contact_data = await extract_contact(request.text)
-        contact = Contact(**contact_data) if any(contact_data.values()) else None
+    return await _normalize(request, http_request.app.state.http, http_request.app.state.llm_batcher)
+
 
-        # Extract entities and get country mapping with typo detection
-        entities_data, country_map, typo_data = await extract_entities(
+@app.post("/normalize/batch")
+async def normalize_batch(request: NormalizeBatchIn, http_request: Request) -> List[NormalizeOut]:
+    """
+    Normalize several messages in one call; results are returned in input order.
+
+    Items are processed concurrently, so with LLM batching enabled their
+    classification calls are coalesced like concurrent single requests.
+    All-or-nothing: if any item fails, the first failure is raised for the
+    whole batch and the other items' results are discarded.
+    """
+    client = http_request.app.state.http
+    batcher = http_request.app.state.llm_batcher
+
+    # return_exceptions=True lets every item finish before we surface a failure
+    results = await asyncio.gather(
+        *(_normalize(item, client, batcher) for item in request.items),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+async def _normalize(request: NormalizeIn, client: httpx.AsyncClient, batcher: Optional[LLMBatcher]) -> NormalizeOut:
+    """Normalize one message; shared by the single and batch endpoints."""
+    try:
+        # Categorization + contact extraction (one LLM call) and entity extraction
+        # are independent upstream calls, so run them concurrently
+        if batcher:
+            combined_task = asyncio.create_task(batcher.submit(request.text))
+        else:
+            combined_task = asyncio.create_task(classify_and_extract(request.text, client))
+        entities_task = asyncio.create_task(extract_entities(
             request.text,
             GEOCODER_BASE_URL,
             USER_AGENT,
-            HTTP_TIMEOUT_SECONDS
-        )
-        entities = [Entity(**entity) for entity in entities_data] if entities_data else None
+            client
+        ))
+
+        # return_exceptions=True lets every task finish before we surface a failure
+        results = await asyncio.gather(combined_task, entities_task, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        (category, contact_data), (entities_data, country_codes, typo_data) = results
+        # Internal results are already validated, so skip pydantic validation with
+        # model_construct; the NormalizeIn request boundary is still validated
+        contact = Contact.model_construct(**contact_data) if any(contact_data.values()) else None
+        entities = [Entity.model_construct(**entity) for entity in entities_data] if entities_data else None
 
-        # Categorize the message (now async)
-        category = await categorize(request.text)
-        
         # Enrich with additional data
         enrichment_data = await enrich(
-            entities_data or [],
-            country_map,
+            country_codes,
             EMERGENCY_API_BASE,
             USER_AGENT,
-            HTTP_TIMEOUT_SECONDS
+            client
         )
 
         # Add typo detection (now included in entity extraction)
         enrichment_data.update(typo_data)
 
-        enrichment = Enrichment(**enrichment_data) if any(enrichment_data.values()) else None
+        enrichment = Enrichment.model_construct(**enrichment_data) if any(enrichment_data.values()) else None
         
         # Build response
-        response = NormalizeOut(
+        response = NormalizeOut.model_construct(
             message_id=request.message_id,
             category=category,
             contact=contact,
@@ -84,9 +182,8 @@ async def normalize_message(request: NormalizeIn) -> NormalizeOut:
         
         return response
         
-    except Exception as e:
-        # Log the error (in production, use proper logging)
-        print(f"Error processing message {request.message_id}: {str(e)}")
+    except Exception:
+        logger.exception("Error processing message %s", request.message_id)
         raise HTTPException(
             status_code=500,
             detail={"error": "InternalError", "detail": "An internal error occurred"}
@@ -121,6 +218,7 @@ async def general_exception_handler(request: Request, exc: Exception):
 
 
 if __name__ == "__main__":
-  import os
   port = int(os.environ.get("PORT", 8080))
-  uvicorn.run(app, host="0.0.0.0", port=port)
+  workers = int(os.environ.get("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1))
+  # uvicorn's default loop/http "auto" settings pick up uvloop and httptools when installed
+  uvicorn.run("src.app:app", host="0.0.0.0", port=port, workers=workers)
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBatcher:
+    """
+    Micro-batches concurrent LLM requests.
+
+    Texts submitted within max_wait seconds of the first queued one (up to
+    max_batch_size) are passed to batch_fn together, and each caller gets
+    back its own result.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[str]], Awaitable[List[Any]]],
+                 max_batch_size: int = 8, max_wait: float = 0.02):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue: "asyncio.Queue[Tuple[str, asyncio.Future]]" = asyncio.Queue()
+        self._runner: Optional[asyncio.Task] = None
+        self._dispatches: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Start the background task that collects and flushes batches."""
+        self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop collecting batches and wait for in-flight batches to finish."""
+        if self._runner:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+        await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+    async def submit(self, text: str) -> Any:
+        """Queue text for the next batch and wait for its result."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(items) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Dispatch in the background so the next batch can start collecting right away
+            task = asyncio.create_task(self._dispatch(items))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, items: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            results = await self.batch_fn([text for text, _ in items])
+        except Exception as e:
+            logger.warning("LLM batch of %d failed: %s", len(items), e)
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(items, results):
+            # The caller may have been cancelled while the batch was in flight
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,69 @@
+import hashlib
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """Bounded in-process cache that evicts the least recently used entry."""
+
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if it isn't cached."""
+        if key not in self._data:
+            return None
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the oldest entry when full."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def save(self, path: str) -> None:
+        """Write all entries to a JSON file, oldest first. Keys must be strings and values JSON-serializable."""
+        data = orjson.dumps(list(self._data.items()))
+        # A temp file unique to this call, so worker processes saving at the same
+        # time each write their own file instead of interleaving into a shared one
+        directory, name = os.path.split(path)
+        fd, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=f"{name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            # Replace in one step so a crash mid-write never leaves a truncated file behind
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load(self, path: str) -> None:
+        """Add entries written by save(). A missing or unreadable file is logged and skipped."""
+        try:
+            with open(path, "rb") as f:
+                entries = orjson.loads(f.read())
+        except FileNotFoundError:
+            return
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning("Could not load cache from %s: %s", path, e)
+            return
+
+        for key, value in entries:
+            self.set(key, value)
+
+
+def make_cache_key(*parts: str) -> str:
+    """Hash everything that determines an LLM response (model, prompt) into a compact key."""
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
@@ -1,91 +1,62 @@
-import asyncio
-import json
-import os
 from typing import Literal
+import ahocorasick
 import httpx
 
+# Shared with the combined classify-and-extract prompt
+CATEGORY_RULES = """RULES:
+- high_risk: Safety, medical, legal, or fraud threats regardless of timing. Examples: lost passport, hospital, police, arrested, scam, credit card stolen, medical emergency, kidnapped, visa denied
+- urgent: Caller needs reply/action ≤24h. Look for explicit time windows like "today", "tonight", "tomorrow", "in two hours", "ASAP", "immediately", "first thing"
+- base: None of the above (general questions, future planning)
 
-async def categorize(text: str) -> Literal["urgent", "high_risk", "base"]:
+IMPORTANT: If both urgent and high_risk apply, return "high_risk" (it takes precedence)."""
+
+# Keyword sets for the fallback classifier
+_HIGH_RISK_KEYWORDS = [
+    "lost passport", "passport stolen", "wallet stolen", "credit card stolen",
+    "hospital", "medical emergency", "police", "arrested", "kidnapped",
+    "visa denied", "scam", "fraud", "stolen", "emergency"
+]
+_URGENT_KEYWORDS = [
+    "today", "tonight", "tomorrow", "asap", "immediately",
+    "urgent", "now", "first thing"
+]
+
+# One Aho-Corasick automaton over both keyword sets finds every (substring) match in a single pass
+_KEYWORD_AUTOMATON = ahocorasick.Automaton()
+for _keyword in _URGENT_KEYWORDS:
+    _KEYWORD_AUTOMATON.add_word(_keyword, "urgent")
+for _keyword in _HIGH_RISK_KEYWORDS:
+    _KEYWORD_AUTOMATON.add_word(_keyword, "high_risk")
+_KEYWORD_AUTOMATON.make_automaton()
+
+
+async def categorize(text: str, client: httpx.AsyncClient) -> Literal["urgent", "high_risk", "base"]:
     """
-    Categorize text based on risk level and urgency using OpenAI API.
+    Categorize text based on risk level and urgency.
 
     Rules:
     1. high_risk: Safety, medical, legal, or fraud threats (takes precedence)
     2. urgent: Needs reply/action ≤24h with explicit time indicators
     3. base: None of the above
-    """
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY environment variable not set")
-
-    prompt = f"""Classify this travel advisor message into exactly one category: "urgent", "high_risk", or "base".
-
-RULES:
-- high_risk: Safety, medical, legal, or fraud threats regardless of timing. Examples: lost passport, hospital, police, arrested, scam, credit card stolen, medical emergency, kidnapped, visa denied
-- urgent: Caller needs reply/action ≤24h. Look for explicit time windows like "today", "tonight", "tomorrow", "in two hours", "ASAP", "immediately", "first thing"
-- base: None of the above (general questions, future planning)
 
-IMPORTANT: If both urgent and high_risk apply, return "high_risk" (it takes precedence).
-
-Message: "{text}"
-
-Respond with ONLY the category name: urgent, high_risk, or base"""
-
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0,
-                    "max_tokens": 10
-                }
-            )
-            response.raise_for_status()
-
-            result = response.json()
-            category = result["choices"][0]["message"]["content"].strip().lower()
-
-            # Validate response
-            if category in ["urgent", "high_risk", "base"]:
-                return category
-            else:
-                # Fallback to base if unexpected response
-                return "base"
+    Thin wrapper over classify_and_extract(), which categorizes and extracts contact
+    info in one OpenAI call; the contact is discarded.
+    """
+    # Imported here because llm_combined imports CATEGORY_RULES from this module
+    from .llm_combined import classify_and_extract
 
-    except Exception as e:
-        # Fallback to simple keyword-based classification if API fails
-        return _fallback_categorize(text)
+    category, _ = await classify_and_extract(text, client)
+    return category
 
 
 def _fallback_categorize(text: str) -> Literal["urgent", "high_risk", "base"]:
     """Fallback classification using simple keyword matching."""
-    text_lower = text.lower()
-
-    # High-risk keywords
-    high_risk_keywords = [
-        "lost passport", "passport stolen", "wallet stolen", "credit card stolen",
-        "hospital", "medical emergency", "police", "arrested", "kidnapped",
-        "visa denied", "scam", "fraud", "stolen", "emergency"
-    ]
+    category = "base"
 
-    for keyword in high_risk_keywords:
-        if keyword in text_lower:
+    for _, keyword_category in _KEYWORD_AUTOMATON.iter(text.lower()):
+        # High-risk takes precedence, so it can end the scan early
+        if keyword_category == "high_risk":
             return "high_risk"
+        category = "urgent"
 
-    # Urgent keywords
-    urgent_keywords = [
-        "today", "tonight", "tomorrow", "asap", "immediately",
-        "urgent", "now", "first thing"
-    ]
-
-    for keyword in urgent_keywords:
-        if keyword in text_lower:
-            return "urgent"
-
-    return "base"
+    return category
@@ -1,73 +1,137 @@
 import asyncio
-from typing import List, Dict, Optional
+import logging
+import time
+from typing import List, Dict, FrozenSet, Optional, Tuple
 import httpx
+import orjson
+from .cache import LRUCache
+from .http_utils import UPSTREAM_ERRORS, request_with_retry
 
+logger = logging.getLogger(__name__)
 
-async def enrich(entities: List[Dict[str, str]], country_map: Dict[str, str], 
-                emergency_api_base: str, user_agent: str, timeout: float = 1.0) -> Dict[str, Optional[List[str]]]:
+# Emergency numbers per country barely ever change, so cache them in-process
+_EMERGENCY_CACHE_TTL_SECONDS = 24 * 60 * 60
+_EMERGENCY_CACHE: Dict[str, Tuple[float, List[str]]] = {}
+# Upstream lookup in progress per country, shared by every request that needs it
+_EMERGENCY_IN_FLIGHT: Dict[str, "asyncio.Task[Optional[List[str]]]"] = {}
+
+# Caps concurrent calls to the emergency API across all requests
+_EMERGENCY_SEMAPHORE = asyncio.Semaphore(8)
+
+# Merged numbers per set of country codes, so common combinations skip the per-country fan-out
+_ENRICH_CACHE = LRUCache(maxsize=1_000)
+
+
+async def enrich(country_codes: FrozenSet[str], emergency_api_base: str, user_agent: str,
+                client: httpx.AsyncClient) -> Dict[str, Optional[List[str]]]:
     """
-    Enrich entities with additional information.
+    Enrich the message's locations with additional information.
+
+    country_codes are the countries of the extracted cities and countries; an
+    empty set means there are no locations to enrich.
 
     Returns dict with enrichment data:
-    - local_emergency_numbers: List of emergency numbers for cities
+    - local_emergency_numbers: List of emergency numbers for the locations
     """
     enrichment = {
         "local_emergency_numbers": None
     }
 
-    # Get all locations from entities (cities and countries)
-    locations = [entity["value"] for entity in entities if entity["type"] in ["city", "country"]]
-
-    if not locations:
-        return enrichment
-
     # Get emergency numbers for all locations
-    emergency_numbers = await _get_emergency_numbers(locations, country_map, emergency_api_base, user_agent, timeout)
+    emergency_numbers = await _get_emergency_numbers(country_codes, emergency_api_base, user_agent, client)
     if emergency_numbers:
         enrichment["local_emergency_numbers"] = emergency_numbers
 
     return enrichment
 
 
-async def _get_emergency_numbers(cities: List[str], country_map: Dict[str, str], 
-                                emergency_api_base: str, user_agent: str, timeout: float) -> Optional[List[str]]:
-    """Get emergency numbers for cities based on their countries."""
+async def _get_emergency_numbers(country_codes: FrozenSet[str], emergency_api_base: str, user_agent: str,
+                                client: httpx.AsyncClient) -> Optional[List[str]]:
+    """Get emergency numbers for the given countries."""
     emergency_numbers = set()
-    
-    # Get unique country codes
-    country_codes = set(country_map.values())
-    
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        tasks = []
-        for country_code in country_codes:
-            task = _fetch_emergency_numbers(country_code, emergency_api_base, user_agent, client)
-            tasks.append(task)
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for result in results:
-            if isinstance(result, list):
-                emergency_numbers.update(result)
-    
+
+    # country_codes is already a deduplicated, hashable set, so it doubles as the cache key
+    if not country_codes:
+        return None
+
+    hit = _ENRICH_CACHE.get(country_codes)
+    if hit and hit[0] > time.monotonic():
+        return list(hit[1])
+
+    tasks = []
+    for country_code in country_codes:
+        task = _fetch_emergency_numbers(country_code, emergency_api_base, user_agent, client)
+        tasks.append(task)
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    for result in results:
+        if isinstance(result, list):
+            emergency_numbers.update(result)
+
+    # Only cache the merged result if every country lookup succeeded, and
+    # let it expire with the earliest of its per-country entries
+    entries = [_EMERGENCY_CACHE.get(code) for code in country_codes]
+    if emergency_numbers and all(entries):
+        expires_at = min(entry[0] for entry in entries)
+        _ENRICH_CACHE.set(country_codes, (expires_at, list(emergency_numbers)))
+
     return list(emergency_numbers) if emergency_numbers else None
 
 
 async def _fetch_emergency_numbers(country_code: str, emergency_api_base: str,
                                   user_agent: str, client: httpx.AsyncClient) -> List[str]:
-    """Fetch emergency numbers for a specific country."""
+    """Fetch emergency numbers for a specific country, served from cache when fresh."""
+    cached = _get_cached_emergency_numbers(country_code)
+    if cached is not None:
+        return cached
+
+    # Only one request per country goes upstream on a cold cache; concurrent callers
+    # await the same lookup and share its result, including a failure
+    task = _EMERGENCY_IN_FLIGHT.get(country_code)
+    if task is None:
+        task = asyncio.create_task(_load_emergency_numbers(country_code, emergency_api_base, user_agent, client))
+        _EMERGENCY_IN_FLIGHT[country_code] = task
+        task.add_done_callback(lambda _: _EMERGENCY_IN_FLIGHT.pop(country_code, None))
+
+    # shield() so a cancelled caller doesn't cancel the lookup the others are waiting on
+    numbers = await asyncio.shield(task)
+    return list(numbers) if numbers is not None else []
+
+
+async def _load_emergency_numbers(country_code: str, emergency_api_base: str,
+                                  user_agent: str, client: httpx.AsyncClient) -> Optional[List[str]]:
+    """Request a country's numbers and cache them on success. Returns None on failure."""
+    numbers = await _request_emergency_numbers(country_code, emergency_api_base, user_agent, client)
+    if numbers is not None:
+        _EMERGENCY_CACHE[country_code] = (time.monotonic() + _EMERGENCY_CACHE_TTL_SECONDS, numbers)
+    return numbers
+
+
+def _get_cached_emergency_numbers(country_code: str) -> Optional[List[str]]:
+    """Return a copy of the cached numbers for a country, or None if missing or expired."""
+    entry = _EMERGENCY_CACHE.get(country_code)
+    if entry and entry[0] > time.monotonic():
+        return list(entry[1])
+    return None
+
+
+async def _request_emergency_numbers(country_code: str, emergency_api_base: str,
+                                     user_agent: str, client: httpx.AsyncClient) -> Optional[List[str]]:
+    """Request emergency numbers from the API. Returns None on failure so errors aren't cached."""
     try:
         url = f"{emergency_api_base}/country/{country_code}"
         headers = {"User-Agent": user_agent}
 
-        response = await client.get(url, headers=headers)
+        async with _EMERGENCY_SEMAPHORE:
+            response = await request_with_retry(client, "GET", url, headers=headers)
         response.raise_for_status()
 
-        api_response = response.json()
+        api_response = orjson.loads(response.content)
         numbers = []
 
-        if isinstance(api_response, dict) and "data" in api_response:
-            data = api_response["data"]
-
+        data = api_response.get("data") if isinstance(api_response, dict) else None
+        if isinstance(data, dict):
             # Check if country is member of 112 group - if so, 112 takes precedence
             is_112_member = data.get("member_112", False)
             if is_112_member:
@@ -75,14 +139,14 @@ async def _fetch_emergency_numbers(country_code: str, emergency_api_base: str,
 
             # Try to get dispatch number first (if not empty)
             dispatch = data.get("dispatch", {})
-            if isinstance(dispatch, dict) and dispatch.get("all"):
-                dispatch_nums = [num for num in dispatch["all"] if num.strip()]
+            if isinstance(dispatch, dict) and isinstance(dispatch.get("all"), list):
+                dispatch_nums = [num for num in dispatch["all"] if isinstance(num, str) and num.strip()]
                 numbers.extend(dispatch_nums)
 
             # Then police number (if different and not empty)
             police = data.get("police", {})
-            if isinstance(police, dict) and police.get("all"):
-                police_nums = [num for num in police["all"] if num.strip() and num not in numbers]
+            if isinstance(police, dict) and isinstance(police.get("all"), list):
+                police_nums = [num for num in police["all"] if isinstance(num, str) and num.strip() and num not in numbers]
                 numbers.extend(police_nums)
 
         # Remove duplicates while preserving order
@@ -95,9 +159,8 @@ async def _fetch_emergency_numbers(country_code: str, emergency_api_base: str,
 
         return unique_numbers
 
-    except Exception as e:
-        # Return empty list on any error
-        print(f"Error fetching emergency numbers for {country_code}: {e}")
-        return []
+    except UPSTREAM_ERRORS as e:
+        logger.warning("Error fetching emergency numbers for %s: %s", country_code, e)
+        return None
 
 
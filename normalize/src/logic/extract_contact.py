@@ -1,24 +1,25 @@
-import json
+import logging
 import os
 import re
 from typing import Dict, Optional
 import httpx
-from .text_utils import extract_phone_digits, is_valid_email, is_valid_zip
+import orjson
+from .cache import LRUCache, make_cache_key
+from .http_utils import UPSTREAM_ERRORS, completion_content, parse_json_object, request_with_retry
+from .text_utils import is_valid_email, is_valid_zip
 
+logger = logging.getLogger(__name__)
 
-async def extract_contact(text: str) -> Dict[str, Optional[str]]:
-    """
-    Extract contact information from text using OpenAI API.
+_MODEL = "gpt-4o-mini"
 
-    Returns dict with keys: first_name, last_name, email, phone, zip
-    Only includes fields that are found and valid.
-    """
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY environment variable not set")
+# Fixed chat/completions fields; only the messages change per call
+_BODY_TEMPLATE = {"model": _MODEL, "temperature": 0, "max_tokens": 150, "response_format": {"type": "json_object"}}
 
-    prompt = f"""Extract contact information from this travel advisor message. Return a JSON object with these fields:
-- first_name: First name (string or null)
+# Keyed on the full prompt, so a prompt or model change invalidates old entries
+_CONTACT_CACHE = LRUCache(maxsize=10_000)
+
+# Shared with the combined classify-and-extract prompt
+CONTACT_RULES = """- first_name: First name (string or null)
 - last_name: Last name (string or null)
 - email: Email address (string or null)
 - phone: Phone number digits only (string or null)
@@ -43,78 +44,118 @@ RULES:
 - Set fields to null if not found
 
 Examples:
-- "Hi Fora, I'm Alex." → {{"first_name": "Alex", "last_name": null, ...}}
-- "I'm John Smith" → {{"first_name": "John", "last_name": "Smith", ...}}
-- "I am Mr. Smith" → {{"first_name": null, "last_name": "Smith", ...}}
-- "I am Dr. Nalwa. Also known as Hari" → {{"first_name": "Hari", "last_name": "Nalwa", ...}}
+- "Hi Fora, I'm Alex." → {"first_name": "Alex", "last_name": null, ...}
+- "I'm John Smith" → {"first_name": "John", "last_name": "Smith", ...}
+- "I am Mr. Smith" → {"first_name": null, "last_name": "Smith", ...}
+- "I am Dr. Nalwa. Also known as Hari" → {"first_name": "Hari", "last_name": "Nalwa", ...}"""
+
+# Fallback patterns, compiled once at import.
+# "Hi X, I'm A B" is covered by the "I'm" branch, so one pattern walks the text once.
+_NAME_RE = re.compile(r'(?:I\'m|I am|This is|My name is)\s+([A-Z][a-z]+)\s+([A-Z][a-z]+)')
+_EMAIL_RE = re.compile(r'[\w\.\+\-]+@[\w\.\-]+\.\w+')
+_PHONE_PATTERNS = [
+    re.compile(r'\((\d{3})\)\s*(\d{3})[-.]?(\d{4})'),
+    re.compile(r'(\d{3})[-.](\d{3})[-.](\d{4})'),
+    re.compile(r'(\d{3})\s+(\d{3})\s+(\d{4})'),
+    re.compile(r'(\d{10})'),
+]
+_ZIP_RE = re.compile(r'\b(\d{5})\b')
+
+# Deletes common phone formatting characters in a single C-level pass
+_PHONE_FORMATTING = str.maketrans('', '', '() -.+\t')
+
+
+async def extract_contact(text: str, client: httpx.AsyncClient) -> Dict[str, Optional[str]]:
+    """
+    Extract contact information from text using OpenAI API.
+
+    Returns dict with keys: first_name, last_name, email, phone, zip
+    Only includes fields that are found and valid.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set")
+
+    prompt = f"""Extract contact information from this travel advisor message. Return a JSON object with these fields:
+{CONTACT_RULES}
 
 Message: "{text}"
 
 Return ONLY valid JSON:"""
 
+    cache_key = make_cache_key(_MODEL, prompt)
+    cached = _CONTACT_CACHE.get(cache_key)
+    if cached is not None:
+        return dict(cached)
+
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0,
-                    "max_tokens": 150
-                }
-            )
-            response.raise_for_status()
-
-            result = response.json()
-            content = result["choices"][0]["message"]["content"].strip()
-
-            # Parse JSON response (handle markdown code blocks)
-            try:
-                # Remove markdown code blocks if present
-                if content.startswith("```json"):
-                    content = content.replace("```json", "").replace("```", "").strip()
-                elif content.startswith("```"):
-                    content = content.replace("```", "").strip()
-
-                contact_data = json.loads(content)
-
-                # Validate and clean the extracted data
-                cleaned_contact = {
-                    "first_name": contact_data.get("first_name"),
-                    "last_name": contact_data.get("last_name"),
-                    "email": contact_data.get("email"),
-                    "phone": contact_data.get("phone"),
-                    "zip": contact_data.get("zip")
-                }
-
-                # Additional validation
-                if cleaned_contact["email"] and not is_valid_email(cleaned_contact["email"]):
-                    cleaned_contact["email"] = None
-
-                if cleaned_contact["phone"]:
-                    # Ensure phone is digits only
-                    cleaned_contact["phone"] = extract_phone_digits(cleaned_contact["phone"])
-                    if len(cleaned_contact["phone"]) != 10:
-                        cleaned_contact["phone"] = None
-
-                if cleaned_contact["zip"] and not is_valid_zip(cleaned_contact["zip"]):
-                    cleaned_contact["zip"] = None
-
-                return cleaned_contact
-
-            except json.JSONDecodeError:
-                # Fallback if JSON parsing fails
-                return _fallback_extract_contact(text)
-
-    except Exception as e:
+        response = await request_with_retry(
+            client,
+            "POST",
+            "https://api.openai.com/v1/chat/completions",
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            content=orjson.dumps({**_BODY_TEMPLATE, "messages": [{"role": "user", "content": prompt}]}),
+            timeout=10.0
+        )
+        response.raise_for_status()
+
+        content = completion_content(parse_json_object(response.content))
+
+        # JSON mode guarantees an object unless the output was cut off at max_tokens
+        try:
+            cleaned_contact = _clean_contact(parse_json_object(content))
+
+            _CONTACT_CACHE.set(cache_key, cleaned_contact)
+            return dict(cleaned_contact)
+
+        except orjson.JSONDecodeError:
+            # Fallback if JSON parsing fails
+            return _fallback_extract_contact(text)
+
+    except UPSTREAM_ERRORS as e:
         # Fallback to regex-based extraction if API fails
+        logger.warning("OpenAI contact extraction failed, using regex fallback: %s", e)
         return _fallback_extract_contact(text)
 
 
+def _clean_contact(contact_data: dict) -> Dict[str, Optional[str]]:
+    """Validate and clean contact fields returned by the LLM."""
+    # The LLM may return numbers for phone/zip; anything else that isn't a string is dropped
+    cleaned_contact = {
+        "first_name": _as_str(contact_data.get("first_name")),
+        "last_name": _as_str(contact_data.get("last_name")),
+        "email": _as_str(contact_data.get("email")),
+        "phone": _as_str(contact_data.get("phone"), allow_int=True),
+        "zip": _as_str(contact_data.get("zip"), allow_int=True)
+    }
+
+    # Additional validation
+    if cleaned_contact["email"] and not is_valid_email(cleaned_contact["email"]):
+        cleaned_contact["email"] = None
+
+    if cleaned_contact["phone"]:
+        # Ensure phone is digits only
+        phone = cleaned_contact["phone"].translate(_PHONE_FORMATTING)
+        cleaned_contact["phone"] = phone if len(phone) == 10 and phone.isdigit() else None
+
+    if cleaned_contact["zip"] and not is_valid_zip(cleaned_contact["zip"]):
+        cleaned_contact["zip"] = None
+
+    return cleaned_contact
+
+
+def _as_str(value: object, allow_int: bool = False) -> Optional[str]:
+    """Return value if it's a string (or an int, when allowed, as a string), else None."""
+    if isinstance(value, str):
+        return value
+    if allow_int and isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    return None
+
+
 def _fallback_extract_contact(text: str) -> Dict[str, Optional[str]]:
     """Fallback contact extraction using regex patterns."""
     result = {
@@ -152,49 +193,31 @@ def _fallback_extract_contact(text: str) -> Dict[str, Optional[str]]:
 
 def _extract_names_fallback(text: str) -> Optional[list]:
     """Extract first and last name using heuristics."""
-    patterns = [
-        r'(?:I\'m|I am|This is)\s+([A-Z][a-z]+)\s+([A-Z][a-z]+)',
-        r'(?:Hi|Hello|Hey)\s+[A-Za-z]+,\s*I\'m\s+([A-Z][a-z]+)\s+([A-Z][a-z]+)',
-        r'My name is\s+([A-Z][a-z]+)\s+([A-Z][a-z]+)'
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, text)
-        if match:
-            return [match.group(1), match.group(2)]
+    match = _NAME_RE.search(text)
+    if match:
+        return [match.group(1), match.group(2)]
 
     return None
 
 
 def _extract_email_fallback(text: str) -> Optional[str]:
     """Extract email address."""
-    pattern = r'[\w\.\+\-]+@[\w\.\-]+\.\w+'
-    match = re.search(pattern, text)
+    match = _EMAIL_RE.search(text)
     return match.group(0) if match else None
 
 
 def _extract_phone_fallback(text: str) -> Optional[str]:
     """Extract US-style phone number and return digits only."""
-    patterns = [
-        r'\((\d{3})\)\s*(\d{3})[-.]?(\d{4})',
-        r'(\d{3})[-.](\d{3})[-.](\d{4})',
-        r'(\d{3})\s+(\d{3})\s+(\d{4})',
-        r'(\d{10})',
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, text)
+    for pattern in _PHONE_PATTERNS:
+        match = pattern.search(text)
         if match:
-            if len(match.groups()) == 3:
-                return extract_phone_digits(''.join(match.groups()))
-            elif len(match.groups()) == 1:
-                return extract_phone_digits(match.group(1))
+            # Every pattern captures digit-only groups, so no further cleanup is needed
+            return ''.join(match.groups())
 
     return None
 
 
 def _extract_zip_fallback(text: str) -> Optional[str]:
     """Extract US 5-digit ZIP code."""
-    pattern = r'\b(\d{5})\b'
-    match = re.search(pattern, text)
+    match = _ZIP_RE.search(text)
     return match.group(1) if match else None
@@ -1,26 +1,25 @@
-import json
+import hashlib
+import logging
 import os
 import re
 import asyncio
-from typing import List, Dict, Tuple, Set
+import time
+import unicodedata
+from typing import Any, List, Dict, FrozenSet, Optional, Tuple, Set
+import ahocorasick
 import httpx
-from .text_utils import normalize_text
+import orjson
+from pydantic import TypeAdapter, ValidationError
+from ..models import Entity
+from .cache import LRUCache
+from .http_utils import UPSTREAM_ERRORS, parse_json_object, request_with_retry
+from .text_utils import extract_phone_digits, normalize_text
 
+logger = logging.getLogger(__name__)
 
-async def extract_entities(text: str, geocoder_url: str, user_agent: str, timeout: float = 1.0) -> Tuple[List[Dict[str, str]], Dict[str, str], Dict[str, str]]:
-    """
-    Extract entities (cities, hotels, restaurants) and detect typos from text using OpenAI API.
-
-    Returns:
-        - List of entities with type and value
-        - Dict mapping entity values to country codes for enrichment
-        - Dict with typo information
-    """
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY environment variable not set")
-
-    prompt = f"""Extract travel-related entities AND detect typos from this message.
+# Instructions go in the system message and the message text in the user message,
+# so every request starts with the same bytes and OpenAI can reuse its prompt cache
+_STATIC_PROMPT = """Extract travel-related entities AND detect typos from the user's travel message.
 
 ENTITY TYPES:
 - city: Cities, towns, or urban places (e.g., "Rome", "New York City", "Paris", "Tokyo", "Seattle", "Vancouver")
@@ -31,8 +30,6 @@ ENTITY TYPES:
 TYPO DETECTION:
 - city_typo: Obvious city misspellings (e.g., "Lndon" → "london", "Seatlee" → "seattle", "Paries" → "paris")
 - country_typo: Country misspellings (e.g., "Mexco" → "mexico")
-- phone_number_typo: Phone numbers with wrong digit count (9, 11+ digits)
-- zip_code_typo: ZIP codes not 5 digits when mentioned with "zip" context
 
 RULES:
 - Return entity values in lowercase
@@ -46,8 +43,6 @@ RULES:
 - For typos: Only include obvious misspellings, be conservative
 - Return empty arrays/nulls if nothing found
 
-Message: "{text}"
-
 EXAMPLES:
 - "staying at Chapter Roma" → hotel: "chapter roma"
 - "eat at Olive Garden" → restaurant: "olive garden"
@@ -55,121 +50,434 @@ EXAMPLES:
 - "going to Mexico" → country: "mexico"
 
 Return ONLY valid JSON:
-{{
-    "entities": [{{"type": "city", "value": "rome"}}, {{"type": "hotel", "value": "chapter roma"}}, {{"type": "restaurant", "value": "olive garden"}}],
-    "typos": {{
+{
+    "entities": [{"type": "city", "value": "rome"}, {"type": "hotel", "value": "chapter roma"}, {"type": "restaurant", "value": "olive garden"}],
+    "typos": {
         "city_typo": "lndon -> london",
-        "country_typo": null,
-        "phone_number_typo": "661248083",
-        "zip_code_typo": null
-    }}
-}}"""
+        "country_typo": null
+    }
+}"""
+
+# The request body up to the user message, serialized once: the system message
+# is byte-identical every call, so only the user turn is encoded per request
+_BODY_TEMPLATE = {
+    "model": "gpt-4o-mini",
+    "temperature": 0,
+    "max_tokens": 200,
+    "response_format": {"type": "json_object"},
+    "stream": True,
+    "stream_options": {"include_usage": True},
+    "messages": [{"role": "system", "content": _STATIC_PROMPT}]
+}
+_BODY_PREFIX = orjson.dumps(_BODY_TEMPLATE)[:-len(b"]}")] + b","
+
+# Hash of everything in the request but the message (model, prompt, settings). It's
+# part of every entity cache key, so a saved cache stops matching when any of it changes
+_REQUEST_FINGERPRINT = hashlib.blake2b(_BODY_PREFIX, digest_size=8).digest()
+
+# LLM extraction results per normalized message text. Values are JSON-friendly
+# [expires_at, entities, country_codes, typos] lists with wall-clock expiry,
+# so the cache can be saved on shutdown and reloaded on startup
+_ENTITY_CACHE_TTL_SECONDS = 24 * 60 * 60
+_ENTITY_CACHE = LRUCache(maxsize=10_000)
+
+# Geocoder answers per city name; a city's country doesn't change, so keep them for
+# 30 days. Same [expires_at, result] layout as the entity cache, and saved the same way
+_GEOCODE_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+_GEOCODE_CACHE = LRUCache(maxsize=10_000)
+
+# Validates the LLM's entity list in pydantic-core rather than a Python loop
+_ENTITY_LIST_ADAPTER = TypeAdapter(List[Entity])
+
+# Word tokens for the near-duplicate key: runs of letters in any script, so non-ASCII
+# words ("москва", "zürich") are kept whole. Messages with digits (phones, ZIPs) only
+# ever match exactly, since a changed number must not reuse old typos
+_WORD_RE = re.compile(r"[^\W\d_]+")
+_DIGIT_RE = re.compile(r"\d")
+
+# Phone and ZIP typos are digit counting, so they're detected locally rather than by the LLM.
+# Phone candidates are digit groups joined by single separators ("661248083", "661-248-083",
+# "(917) 555-123", "+44 20 7946 0958"), starting at the beginning of a number; ISO dates
+# and ZIP+4 codes are skipped
+_PHONE_CANDIDATE_RE = re.compile(
+    r'(?<![\d+(])(?<!\d[ .-])(?!\d{4}-\d{2}-\d{2}(?!\d))(?!\d{5}-\d{4}(?!\d))'
+    r'\+?\(?\d+\)?(?:[ .-]?\(?\d+\)?)*(?!\d)'
+)
+# Long digit runs are also booking refs, order and card numbers, so a candidate with the
+# wrong digit count is only a phone typo if it's phone-shaped or follows a phone keyword
+_PHONE_SHAPE_RE = re.compile(r'\(\d{2,4}\)|\d{3}[ .-]\d{3}[ .-]\d{3,4}')
+_PHONE_CONTEXT_RE = re.compile(r'\b(?:call|phone|cell|mobile|tel|text|number|whatsapp|reach)\b', re.IGNORECASE)
+_PHONE_CONTEXT_WINDOW = 30
+# Any number given as a ZIP/postal code; it's a typo unless it's 5 digits or ZIP+4
+_ZIP_CONTEXT_RES = [
+    re.compile(r'\b(?:zip|postal)(?:\s*code)?\s*(?:is|:)?\s*(\d+(?:-\d+)?)\b', re.IGNORECASE),
+    re.compile(r'\b(\d+(?:-\d+)?)\s+(?:zip|postal)\b', re.IGNORECASE),
+]
+_VALID_ZIP_RE = re.compile(r'\d{5}(?:-\d{4})?')
+
+# Entity names are usually capitalized words; numbers are handled by _local_typos, so a
+# message without a capitalized word or a known name ("flight in 3 h, need assistance")
+# skips the LLM. See _has_entity_candidates()
+_HAS_CANDIDATES_RE = re.compile(r'[A-Z][a-z]{2,}')
+# A word after a place preposition ("stolen in nashville"), in any case
+_PLACE_SLOT_RE = re.compile(r'\b(?:in|to|at|from)\s+[a-z]{3,}', re.IGNORECASE)
+
+# Fallback city candidates: capitalized phrases after "in"/"to"
+_CITY_CANDIDATE_PATTERNS = [
+    re.compile(r'\bin\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)'),
+    re.compile(r'\bto\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)'),
+]
+
+# Common cities the fallback always looks for, matched case-insensitively
+_CITY_PHRASES = [
+    "New York City", "New York", "Los Angeles", "San Francisco",
+    "Las Vegas", "Miami", "Chicago", "Boston", "Seattle",
+    "Paris", "London", "Rome", "Barcelona", "Amsterdam", "Berlin",
+    "Tokyo", "Sydney", "Dubai", "Istanbul"
+]
+_CITY_PHRASE_AUTOMATON = ahocorasick.Automaton()
+for _phrase in _CITY_PHRASES:
+    _CITY_PHRASE_AUTOMATON.add_word(_phrase.lower(), _phrase)
+_CITY_PHRASE_AUTOMATON.make_automaton()
+
+# Hotel names the fallback recognizes, keyed by their normalized text
+_HOTEL_NAMES = {
+    "marriott": "Marriott",
+    "hilton": "Hilton",
+    "hyatt": "Hyatt",
+    "four seasons": "Four Seasons",
+    "chapter roma": "Chapter Roma",
+}
+_HOTEL_AUTOMATON = ahocorasick.Automaton()
+for _keyword, _hotel in _HOTEL_NAMES.items():
+    _HOTEL_AUTOMATON.add_word(_keyword, _hotel)
+_HOTEL_AUTOMATON.make_automaton()
+
+
+async def extract_entities(text: str, geocoder_url: str, user_agent: str, client: httpx.AsyncClient) -> Tuple[List[Dict[str, str]], FrozenSet[str], Dict[str, str]]:
+    """
+    Extract entities (cities, hotels, restaurants) and detect typos from text using OpenAI API.
+
+    Returns:
+        - List of entities with type and value
+        - Set of country codes for the locations, for enrichment
+        - Dict with typo information
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set")
+
+    local_typos = _local_typos(text)
+    if not _has_entity_candidates(text):
+        return [], frozenset(), {"city_typo": None, "country_typo": None, **local_typos}
+
+    cache_key = _entity_cache_key(text)
+    near_key = _near_duplicate_key(text)
+    for key in (cache_key, near_key):
+        cached = _get_cached_entities(key) if key else None
+        if cached is not None:
+            return cached
+
+    # Run the regex/geocoder fallback speculatively alongside the LLM call, so a
+    # failed call doesn't add the fallback's geocoding round-trips on top of it
+    fallback_task = asyncio.create_task(_fallback_extract_entities(text, geocoder_url, user_agent, client))
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0,
-                    "max_tokens": 300
-                }
-            )
-            response.raise_for_status()
-
-            result = response.json()
-            content = result["choices"][0]["message"]["content"].strip()
-
-            # Parse JSON response (handle markdown code blocks)
-            try:
-                # Remove markdown code blocks if present
-                if content.startswith("```json"):
-                    content = content.replace("```json", "").replace("```", "").strip()
-                elif content.startswith("```"):
-                    content = content.replace("```", "").strip()
-
-                parsed_response = json.loads(content)
-
-                # Handle both old array format and new object format for backward compatibility
-                if isinstance(parsed_response, list):
-                    # Old format - just entities
-                    entities = parsed_response
-                    typos = {"city_typo": None, "country_typo": None, "phone_number_typo": None, "zip_code_typo": None}
-                else:
-                    # New format - object with entities and typos
-                    entities = parsed_response.get("entities", [])
-                    typos = parsed_response.get("typos", {})
-
-                # Validate entity structure
-                validated_entities = []
-                for entity in entities:
-                    if (isinstance(entity, dict) and
-                        "type" in entity and "value" in entity and
-                        entity["type"] in ["city", "country", "hotel", "restaurant"] and
-                        isinstance(entity["value"], str)):
-                        validated_entities.append({
-                            "type": entity["type"],
-                            "value": entity["value"].lower().strip()
-                        })
-
-                # Get country codes for cities using geocoding and country name mapping
-                country_map = {}
-                city_entities = [e for e in validated_entities if e["type"] == "city"]
-                country_entities = [e for e in validated_entities if e["type"] == "country"]
-
-                # Handle cities via geocoding
-                if city_entities:
-                    city_names = [e["value"] for e in city_entities]
-                    country_map = await _get_country_codes(city_names, geocoder_url, user_agent, timeout)
-
-                    # Add direct country name mappings for cities
-                    country_name_map = _get_country_name_mappings(city_names)
-                    country_map.update(country_name_map)
-
-                # Handle countries directly
-                if country_entities:
-                    country_names = [e["value"] for e in country_entities]
-                    country_name_map = _get_country_name_mappings(country_names)
-                    country_map.update(country_name_map)
-
-                return validated_entities, country_map, typos
-
-            except json.JSONDecodeError:
-                # Fallback if JSON parsing fails
-                return await _fallback_extract_entities(text, geocoder_url, user_agent, timeout)
-
-    except Exception as e:
-        # Fallback to original method if API fails
-        return await _fallback_extract_entities(text, geocoder_url, user_agent, timeout)
-
-
-async def _get_country_codes(city_names: List[str], geocoder_url: str, user_agent: str, timeout: float) -> Dict[str, str]:
+        content = await _stream_completion(text, api_key, client)
+
+        # JSON mode guarantees an object unless the output was cut off at max_tokens
+        try:
+            parsed_response = parse_json_object(content)
+            entities = parsed_response.get("entities", [])
+            llm_typos = parsed_response.get("typos")
+            if not isinstance(llm_typos, dict):
+                llm_typos = {}
+            typos = {
+                "city_typo": _str_or_none(llm_typos.get("city_typo")),
+                "country_typo": _str_or_none(llm_typos.get("country_typo")),
+                **local_typos
+            }
+
+            # Validate entity structure
+            validated_entities = [
+                {"type": entity.type, "value": entity.value.lower().strip()}
+                for entity in _validate_entities(entities)
+            ]
+
+            # Get country codes for cities using geocoding and country name mapping
+            country_map = {}
+            city_names = []
+            country_names = []
+            for entity in validated_entities:
+                if entity["type"] == "city":
+                    city_names.append(entity["value"])
+                elif entity["type"] == "country":
+                    country_names.append(entity["value"])
+
+            # Handle cities via geocoding
+            if city_names:
+                # Cities in the static map don't need a network lookup; geocode
+                # each remaining name once, and let the static map win on overlap
+                local_map = _get_country_name_mappings(city_names)
+                unresolved = list({name for name in city_names if name not in local_map})
+                if unresolved:
+                    country_map = await _get_country_codes(unresolved, geocoder_url, user_agent, client)
+                country_map.update(local_map)
+
+            # Handle countries directly
+            if country_names:
+                country_name_map = _get_country_name_mappings(country_names)
+                country_map.update(country_name_map)
+
+            country_codes = frozenset(country_map.values())
+            entry = [time.time() + _ENTITY_CACHE_TTL_SECONDS, validated_entities, sorted(country_codes), typos]
+            _ENTITY_CACHE.set(cache_key, entry)
+            if near_key:
+                _ENTITY_CACHE.set(near_key, entry)
+            return [dict(e) for e in validated_entities], country_codes, dict(typos)
+
+        except orjson.JSONDecodeError:
+            # Fallback if JSON parsing fails
+            return await fallback_task
+
+    except UPSTREAM_ERRORS as e:
+        # Fallback to original method if API fails (not cached)
+        logger.warning("OpenAI entity extraction failed, using regex/geocoder fallback: %s", e)
+        return await fallback_task
+
+    finally:
+        # No-op if the fallback was used; otherwise its result isn't needed
+        fallback_task.cancel()
+
+
+def _has_entity_candidates(text: str) -> bool:
+    """
+    Whether text may name a place or hotel: a capitalized ASCII word, a word after
+    in/to/at/from ("stolen in nashville"), any non-ASCII letter (uncased scripts and
+    lowercase accented names can't be judged by case), or a known city, country or
+    hotel name in any case ("paris is where i lost it").
+    """
+    if _HAS_CANDIDATES_RE.search(text) or _PLACE_SLOT_RE.search(text):
+        return True
+    if not text.isascii() and any(not char.isascii() and char.isalpha() for char in text):
+        return True
+
+    normalized = normalize_text(text)
+    for end, length in _KNOWN_NAME_AUTOMATON.iter(normalized):
+        # Whole words only, so "lima" doesn't match inside "climate"
+        start = end - length + 1
+        if ((start == 0 or not normalized[start - 1].isalnum()) and
+                (end + 1 == len(normalized) or not normalized[end + 1].isalnum())):
+            return True
+    return False
+
+
+def _validate_entities(entities: Any) -> List[Entity]:
+    """Validate the LLM's entity list, dropping malformed items instead of rejecting them all."""
+    try:
+        return _ENTITY_LIST_ADAPTER.validate_python(entities)
+    except ValidationError as e:
+        # Item errors are located by list index; anything else means the list itself is malformed
+        errors = e.errors()
+        if not all(error["loc"] and isinstance(error["loc"][0], int) for error in errors):
+            return []
+        bad_indexes = {error["loc"][0] for error in errors}
+        return _ENTITY_LIST_ADAPTER.validate_python(
+            [entity for i, entity in enumerate(entities) if i not in bad_indexes]
+        )
+
+
+async def _stream_completion(text: str, api_key: str, client: httpx.AsyncClient) -> str:
+    """
+    Stream the entity extraction completion for text and return the full message content.
+
+    The JSON is only parsed once complete, but streaming lets the body arrive
+    while the model is still generating instead of in one piece at the end.
+    """
+    parts = []
+    response = await request_with_retry(
+        client,
+        "POST",
+        "https://api.openai.com/v1/chat/completions",
+        stream=True,
+        headers={
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        },
+        content=_BODY_PREFIX + orjson.dumps({"role": "user", "content": text}) + b"]}",
+        timeout=10.0
+    )
+    try:
+        response.raise_for_status()
+
+        # Server-sent events: one "data: {chunk}" line per delta, then "data: [DONE]"
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            data = line[len("data: "):]
+            if data == "[DONE]":
+                break
+
+            chunk = parse_json_object(data)
+            # With include_usage, the last chunk carries usage and no choices
+            if isinstance(chunk.get("usage"), dict):
+                _log_prompt_cache_usage(chunk)
+            choices = chunk.get("choices") or []
+            if not isinstance(choices, list):
+                raise ValueError("completion chunk choices is not a list")
+            for choice in choices:
+                delta = choice.get("delta") if isinstance(choice, dict) else None
+                if not isinstance(delta, dict):
+                    raise ValueError("completion chunk choice has no delta")
+                content = delta.get("content")
+                if isinstance(content, str):
+                    parts.append(content)
+    finally:
+        await response.aclose()
+
+    return "".join(parts)
+
+
+def _log_prompt_cache_usage(result: dict) -> None:
+    """Log how many prompt tokens OpenAI served from its prompt cache."""
+    usage = result["usage"]
+    details = usage.get("prompt_tokens_details")
+    if not isinstance(details, dict):
+        details = {}
+    logger.debug("Entity extraction prompt tokens: %s (cached: %s)",
+                 usage.get("prompt_tokens"), details.get("cached_tokens", 0))
+
+
+def _str_or_none(value: Any) -> Optional[str]:
+    """Return value if it's a non-empty string, else None."""
+    return value if isinstance(value, str) and value else None
+
+
+def _local_typos(text: str) -> Dict[str, Optional[str]]:
+    """Detect phone numbers and ZIP codes with the wrong number of digits."""
+    zip_typo = None
+    zip_spans = []
+    for pattern in _ZIP_CONTEXT_RES:
+        for match in pattern.finditer(text):
+            zip_spans.append(match.span(1))
+            if zip_typo is None and not _VALID_ZIP_RE.fullmatch(match.group(1)):
+                zip_typo = match.group(1)
+
+    phone_typo = None
+    for match in _PHONE_CANDIDATE_RE.finditer(text):
+        start, end = match.span()
+        # Numbers given as ZIP codes were judged above
+        if any(start < zip_end and zip_start < end for zip_start, zip_end in zip_spans):
+            continue
+
+        candidate = match.group(0)
+        digits = extract_phone_digits(candidate)
+        if not 7 <= len(digits) <= 15 or _is_valid_phone(candidate, digits):
+            continue
+        if _PHONE_SHAPE_RE.search(candidate) or _PHONE_CONTEXT_RE.search(text, max(0, start - _PHONE_CONTEXT_WINDOW), start):
+            phone_typo = digits
+            break
+
+    return {"phone_number_typo": phone_typo, "zip_code_typo": zip_typo}
+
+
+def _is_valid_phone(candidate: str, digits: str) -> bool:
+    """US numbers have 10 digits, or 11 with the leading 1; other +country numbers follow E.164 (8-15)."""
+    if candidate.startswith("+1"):
+        return len(digits) == 11
+    if candidate.startswith("+"):
+        return 8 <= len(digits) <= 15
+    return len(digits) == 10 or (len(digits) == 11 and digits[0] == "1")
+
+
+def save_entity_cache(path: str) -> None:
+    """Persist the entity cache to a JSON file so a restart starts warm."""
+    _ENTITY_CACHE.save(path)
+
+
+def load_entity_cache(path: str) -> None:
+    """Load a cache file written by save_entity_cache(); expired entries are skipped on lookup."""
+    _ENTITY_CACHE.load(path)
+
+
+def save_geocode_cache(path: str) -> None:
+    """Persist the geocoding cache to a JSON file so a restart starts warm."""
+    _GEOCODE_CACHE.save(path)
+
+
+def load_geocode_cache(path: str) -> None:
+    """Load a cache file written by save_geocode_cache(); expired entries are skipped on lookup."""
+    _GEOCODE_CACHE.load(path)
+
+
+def _entity_cache_key(text: str) -> str:
+    """Key on the request settings and normalized text, so case and whitespace variants share an entry."""
+    return hashlib.blake2b(_REQUEST_FINGERPRINT + normalize_text(text).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _near_duplicate_key(text: str) -> Optional[str]:
+    """
+    Key on the sequence of words, so messages that differ only in punctuation and
+    spacing share an entry. Word order is kept: swapping words between place names
+    ("North Korea ... South Africa") changes the entities. None if the text has digits,
+    or anything else besides words, whitespace and punctuation that the key would drop.
+    """
+    normalized = normalize_text(text)
+    if _DIGIT_RE.search(normalized):
+        return None
+    if not all(char.isspace() or unicodedata.category(char).startswith("P") for char in _WORD_RE.sub("", normalized)):
+        return None
+    tokens = " ".join(_WORD_RE.findall(normalized))
+    return "words:" + hashlib.blake2b(_REQUEST_FINGERPRINT + tokens.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _get_cached_entities(cache_key: str) -> Optional[Tuple[List[Dict[str, str]], FrozenSet[str], Dict[str, str]]]:
+    """Return a copy of the cached extraction result, or None if missing or expired."""
+    entry = _ENTITY_CACHE.get(cache_key)
+    if not entry or entry[0] <= time.time():
+        return None
+
+    _, entities, country_codes, typos = entry
+    return [dict(e) for e in entities], frozenset(country_codes), dict(typos)
+
+
+async def _get_country_codes(city_names: List[str], geocoder_url: str, user_agent: str, client: httpx.AsyncClient) -> Dict[str, str]:
     """Get country codes for city names using geocoding."""
     country_map = {}
 
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        tasks = []
-        for city_name in city_names:
-            task = _geocode_city(city_name, geocoder_url, user_agent, client)
-            tasks.append(task)
+    tasks = []
+    for city_name in city_names:
+        task = _geocode_city(city_name, geocoder_url, user_agent, client)
+        tasks.append(task)
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+    results = await asyncio.gather(*tasks, return_exceptions=True)
 
-        for i, result in enumerate(results):
-            if isinstance(result, dict) and "city" in result and "country_code" in result:
-                city_key = city_names[i].lower()
-                country_map[city_key] = result["country_code"]
+    for i, result in enumerate(results):
+        if isinstance(result, dict) and "city" in result and "country_code" in result:
+            city_key = city_names[i].lower()
+            country_map[city_key] = result["country_code"]
 
     return country_map
 
 
 async def _geocode_city(city_name: str, geocoder_url: str, user_agent: str, client: httpx.AsyncClient) -> Dict[str, str]:
-    """Geocode a single city to get country code."""
+    """Geocode a single city to get country code, served from cache when fresh."""
+    key = city_name.strip().lower()
+    entry = _GEOCODE_CACHE.get(key)
+    if entry and entry[0] > time.time():
+        return dict(entry[1])
+
+    result = await _request_geocode(city_name, geocoder_url, user_agent, client)
+    if result is None:
+        return {}
+
+    # "Not a city" answers are cached too, so fallback candidates aren't re-checked
+    _GEOCODE_CACHE.set(key, [time.time() + _GEOCODE_CACHE_TTL_SECONDS, result])
+    return dict(result)
+
+
+async def _request_geocode(city_name: str, geocoder_url: str, user_agent: str, client: httpx.AsyncClient) -> Optional[Dict[str, str]]:
+    """Geocode a single city to get country code. Returns None on failure so errors aren't cached."""
     try:
         params = {
             "q": city_name,
@@ -183,8 +491,8 @@ async def _geocode_city(city_name: str, geocoder_url: str, user_agent: str, clie
         response = await client.get(geocoder_url, params=params, headers=headers)
         response.raise_for_status()
 
-        data = response.json()
-        if data and len(data) > 0:
+        data = orjson.loads(response.content)
+        if isinstance(data, list) and data and isinstance(data[0], dict):
             place = data[0]
             place_type = place.get("type", "")
             place_class = place.get("class", "")
@@ -193,22 +501,25 @@ async def _geocode_city(city_name: str, geocoder_url: str, user_agent: str, clie
             addresstype = place.get("addresstype", "")
             if ((place_class == "place" and place_type in ["city", "town", "village"]) or
                 (place_class == "boundary" and place_type == "administrative" and addresstype in ["city", "province"])):
-                address = place.get("address", {})
-                country_code = address.get("country_code", "").upper()
-                display_name = place.get("display_name", "").split(",")[0]
+                address = place.get("address")
+                country_code = address.get("country_code") if isinstance(address, dict) else None
+                display_name = place.get("display_name")
+                if not isinstance(country_code, str) or not isinstance(display_name, str):
+                    raise ValueError(f"geocoder result for {city_name!r} lacks a country code or name")
 
                 return {
-                    "city": display_name,
-                    "country_code": country_code
+                    "city": display_name.split(",")[0],
+                    "country_code": country_code.upper()
                 }
 
-    except Exception:
-        pass
+        return {}
 
-    return {}
+    except UPSTREAM_ERRORS as e:
+        logger.warning("Geocoding %r failed: %s", city_name, e)
+        return None
 
 
-async def _fallback_extract_entities(text: str, geocoder_url: str, user_agent: str, timeout: float) -> Tuple[List[Dict[str, str]], Dict[str, str], Dict[str, str]]:
+async def _fallback_extract_entities(text: str, geocoder_url: str, user_agent: str, client: httpx.AsyncClient) -> Tuple[List[Dict[str, str]], FrozenSet[str], Dict[str, str]]:
     """Fallback entity extraction using original regex-based approach."""
     entities = []
     country_map = {}
@@ -218,69 +529,52 @@ async def _fallback_extract_entities(text: str, geocoder_url: str, user_agent: s
 
     # Validate cities with geocoding
     if city_candidates:
-        validated_cities = await _validate_cities_fallback(city_candidates, geocoder_url, user_agent, timeout)
+        validated_cities = await _validate_cities_fallback(city_candidates, geocoder_url, user_agent, client)
         for city, country_code in validated_cities.items():
             entities.append({"type": "city", "value": city.lower()})
             country_map[city.lower()] = country_code
 
-    # Extract hotels and restaurants
+    # Extract hotels (restaurant names can't be told apart by keywords alone)
     hotels = _extract_hotels_fallback(text)
-    restaurants = _extract_restaurants_fallback(text)
-
     entities.extend([{"type": "hotel", "value": hotel.lower()} for hotel in hotels])
-    entities.extend([{"type": "restaurant", "value": restaurant.lower()} for restaurant in restaurants])
 
-    # No typos in fallback mode
-    typos = {"city_typo": None, "country_typo": None, "phone_number_typo": None, "zip_code_typo": None}
-    return entities, country_map, typos
+    # Only the locally detected numeric typos in fallback mode
+    typos = {"city_typo": None, "country_typo": None, **_local_typos(text)}
+    return entities, frozenset(country_map.values()), typos
 
 
 def _extract_city_candidates_fallback(text: str) -> Set[str]:
     """Extract potential city names from text using regex."""
     candidates = set()
 
-    patterns = [
-        r'\bin\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-        r'\bto\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-    ]
-
-    for pattern in patterns:
-        matches = re.findall(pattern, text)
+    for pattern in _CITY_CANDIDATE_PATTERNS:
+        matches = pattern.findall(text)
         for match in matches:
             city = match.strip()
             if len(city) > 1:
                 candidates.add(city)
 
-    # Common cities
-    city_phrases = [
-        "New York City", "New York", "Los Angeles", "San Francisco",
-        "Las Vegas", "Miami", "Chicago", "Boston", "Seattle",
-        "Paris", "London", "Rome", "Barcelona", "Amsterdam", "Berlin",
-        "Tokyo", "Sydney", "Dubai", "Istanbul"
-    ]
-
-    for phrase in city_phrases:
-        if phrase.lower() in text.lower():
-            candidates.add(phrase)
+    # Common cities (substring matches, all phrases in one pass)
+    for _, phrase in _CITY_PHRASE_AUTOMATON.iter(text.lower()):
+        candidates.add(phrase)
 
     return candidates
 
 
-async def _validate_cities_fallback(candidates: Set[str], geocoder_url: str, user_agent: str, timeout: float) -> Dict[str, str]:
+async def _validate_cities_fallback(candidates: Set[str], geocoder_url: str, user_agent: str, client: httpx.AsyncClient) -> Dict[str, str]:
     """Validate city candidates using geocoding API."""
     validated = {}
 
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        tasks = []
-        for candidate in candidates:
-            task = _geocode_city(candidate, geocoder_url, user_agent, client)
-            tasks.append(task)
+    tasks = []
+    for candidate in candidates:
+        task = _geocode_city(candidate, geocoder_url, user_agent, client)
+        tasks.append(task)
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+    results = await asyncio.gather(*tasks, return_exceptions=True)
 
-        for i, result in enumerate(results):
-            if isinstance(result, dict) and "city" in result and "country_code" in result:
-                validated[result["city"]] = result["country_code"]
+    for i, result in enumerate(results):
+        if isinstance(result, dict) and "city" in result and "country_code" in result:
+            validated[result["city"]] = result["country_code"]
 
     return validated
 
@@ -288,159 +582,144 @@ async def _validate_cities_fallback(candidates: Set[str], geocoder_url: str, use
 def _extract_hotels_fallback(text: str) -> List[str]:
     """Extract hotel names using keyword matching."""
     hotels = []
-    hotel_keywords = {"hotel", "inn", "resort", "lodge", "hostel", "marriott", "hilton", "hyatt", "four seasons", "chapter roma"}
-    normalized = normalize_text(text)
-
-    for keyword in hotel_keywords:
-        if keyword in normalized:
-            if keyword == "chapter roma":
-                if "chapter roma" in normalized:
-                    hotels.append("Chapter Roma")
+    for _, hotel in _HOTEL_AUTOMATON.iter(normalize_text(text)):
+        if hotel not in hotels:
+            hotels.append(hotel)
 
     return hotels
 
 
-def _extract_restaurants_fallback(text: str) -> List[str]:
-    """Extract restaurant names using keyword matching."""
-    restaurants = []
-    restaurant_keywords = {"restaurant", "trattoria", "osteria", "cafe", "bistro"}
-    normalized = normalize_text(text)
-
-    for keyword in restaurant_keywords:
-        if keyword in normalized:
-            # Simple extraction for fallback
-            pass
-
-    return restaurants
+# Country names and major cities mapped directly to ISO codes, built once at import
+_COUNTRY_MAPPINGS: Dict[str, str] = {
+    # Major countries commonly mentioned in travel
+    "south africa": "ZA",
+    "south korea": "KR",
+    "north korea": "KP",
+    "united states": "US",
+    "united kingdom": "GB",
+    "great britain": "GB",
+    "germany": "DE",
+    "france": "FR",
+    "italy": "IT",
+    "spain": "ES",
+    "netherlands": "NL",
+    "belgium": "BE",
+    "switzerland": "CH",
+    "austria": "AT",
+    "china": "CN",
+    "japan": "JP",
+    "australia": "AU",
+    "canada": "CA",
+    "mexico": "MX",
+    "brazil": "BR",
+    "argentina": "AR",
+    "chile": "CL",
+    "colombia": "CO",
+    "peru": "PE",
+    "venezuela": "VE",
+    "russia": "RU",
+    "india": "IN",
+    "thailand": "TH",
+    "vietnam": "VN",
+    "singapore": "SG",
+    "malaysia": "MY",
+    "indonesia": "ID",
+    "philippines": "PH",
+    "turkey": "TR",
+    "egypt": "EG",
+    "morocco": "MA",
+    "kenya": "KE",
+    "nigeria": "NG",
+    "ghana": "GH",
+    "iran": "IR",
+    "iraq": "IQ",
+    "israel": "IL",
+    "jordan": "JO",
+    "lebanon": "LB",
+    "saudi arabia": "SA",
+    "uae": "AE",
+    "united arab emirates": "AE",
+    "new zealand": "NZ",
+
+    # Major cities to country mappings
+    "paris": "FR",
+    "london": "GB",
+    "berlin": "DE",
+    "madrid": "ES",
+    "barcelona": "ES",
+    "amsterdam": "NL",
+    "brussels": "BE",
+    "vienna": "AT",
+    "zurich": "CH",
+    "geneva": "CH",
+    "stockholm": "SE",
+    "oslo": "NO",
+    "copenhagen": "DK",
+    "helsinki": "FI",
+    "prague": "CZ",
+    "budapest": "HU",
+    "warsaw": "PL",
+    "moscow": "RU",
+    "st petersburg": "RU",
+    "tokyo": "JP",
+    "osaka": "JP",
+    "kyoto": "JP",
+    "seoul": "KR",
+    "beijing": "CN",
+    "shanghai": "CN",
+    "hong kong": "HK",
+    "singapore": "SG",
+    "bangkok": "TH",
+    "mumbai": "IN",
+    "delhi": "IN",
+    "bangalore": "IN",
+    "sydney": "AU",
+    "melbourne": "AU",
+    "toronto": "CA",
+    "vancouver": "CA",
+    "montreal": "CA",
+    "new york": "US",
+    "nyc": "US",
+    "los angeles": "US",
+    "chicago": "US",
+    "san francisco": "US",
+    "miami": "US",
+    "las vegas": "US",
+    "boston": "US",
+    "washington": "US",
+    "seattle": "US",
+    "mexico city": "MX",
+    "cancun": "MX",
+    "rio de janeiro": "BR",
+    "sao paulo": "BR",
+    "buenos aires": "AR",
+    "lima": "PE",
+    "santiago": "CL",
+    "bogota": "CO",
+    "caracas": "VE",
+    "cairo": "EG",
+    "cape town": "ZA",
+    "johannesburg": "ZA",
+    "nairobi": "KE",
+    "istanbul": "TR",
+    "athens": "GR",
+    "lisbon": "PT",
+    "dublin": "IE",
+    "reykjavik": "IS",
+    "tel aviv": "IL",
+    "dubai": "AE",
+    "doha": "QA",
+    "riyadh": "SA"
+}
+
+
+# Every name the static tables know, for the pre-LLM candidate check
+_KNOWN_NAME_AUTOMATON = ahocorasick.Automaton()
+for _name in (*_COUNTRY_MAPPINGS, *(phrase.lower() for phrase in _CITY_PHRASES), *_HOTEL_NAMES):
+    _KNOWN_NAME_AUTOMATON.add_word(_name, len(_name))
+_KNOWN_NAME_AUTOMATON.make_automaton()
 
 
 def _get_country_name_mappings(city_names: List[str]) -> Dict[str, str]:
     """Map country names and major cities directly to their ISO codes."""
-    mappings = {
-        # Major countries commonly mentioned in travel
-        "south africa": "ZA",
-        "south korea": "KR",
-        "north korea": "KP",
-        "united states": "US",
-        "united kingdom": "GB",
-        "great britain": "GB",
-        "germany": "DE",
-        "france": "FR",
-        "italy": "IT",
-        "spain": "ES",
-        "netherlands": "NL",
-        "belgium": "BE",
-        "switzerland": "CH",
-        "austria": "AT",
-        "china": "CN",
-        "japan": "JP",
-        "australia": "AU",
-        "canada": "CA",
-        "mexico": "MX",
-        "brazil": "BR",
-        "argentina": "AR",
-        "chile": "CL",
-        "colombia": "CO",
-        "peru": "PE",
-        "venezuela": "VE",
-        "russia": "RU",
-        "india": "IN",
-        "thailand": "TH",
-        "vietnam": "VN",
-        "singapore": "SG",
-        "malaysia": "MY",
-        "indonesia": "ID",
-        "philippines": "PH",
-        "turkey": "TR",
-        "egypt": "EG",
-        "morocco": "MA",
-        "kenya": "KE",
-        "nigeria": "NG",
-        "ghana": "GH",
-        "iran": "IR",
-        "iraq": "IQ",
-        "israel": "IL",
-        "jordan": "JO",
-        "lebanon": "LB",
-        "saudi arabia": "SA",
-        "uae": "AE",
-        "united arab emirates": "AE",
-        "new zealand": "NZ",
-
-        # Major cities to country mappings
-        "paris": "FR",
-        "london": "GB",
-        "berlin": "DE",
-        "madrid": "ES",
-        "barcelona": "ES",
-        "amsterdam": "NL",
-        "brussels": "BE",
-        "vienna": "AT",
-        "zurich": "CH",
-        "geneva": "CH",
-        "stockholm": "SE",
-        "oslo": "NO",
-        "copenhagen": "DK",
-        "helsinki": "FI",
-        "prague": "CZ",
-        "budapest": "HU",
-        "warsaw": "PL",
-        "moscow": "RU",
-        "st petersburg": "RU",
-        "tokyo": "JP",
-        "osaka": "JP",
-        "kyoto": "JP",
-        "seoul": "KR",
-        "beijing": "CN",
-        "shanghai": "CN",
-        "hong kong": "HK",
-        "singapore": "SG",
-        "bangkok": "TH",
-        "mumbai": "IN",
-        "delhi": "IN",
-        "bangalore": "IN",
-        "sydney": "AU",
-        "melbourne": "AU",
-        "toronto": "CA",
-        "vancouver": "CA",
-        "montreal": "CA",
-        "new york": "US",
-        "nyc": "US",
-        "los angeles": "US",
-        "chicago": "US",
-        "san francisco": "US",
-        "miami": "US",
-        "las vegas": "US",
-        "boston": "US",
-        "washington": "US",
-        "seattle": "US",
-        "mexico city": "MX",
-        "cancun": "MX",
-        "rio de janeiro": "BR",
-        "sao paulo": "BR",
-        "buenos aires": "AR",
-        "lima": "PE",
-        "santiago": "CL",
-        "bogota": "CO",
-        "caracas": "VE",
-        "cairo": "EG",
-        "cape town": "ZA",
-        "johannesburg": "ZA",
-        "nairobi": "KE",
-        "istanbul": "TR",
-        "athens": "GR",
-        "lisbon": "PT",
-        "dublin": "IE",
-        "reykjavik": "IS",
-        "tel aviv": "IL",
-        "dubai": "AE",
-        "doha": "QA",
-        "riyadh": "SA"
-    }
-
-    result = {}
-    for city_name in city_names:
-        if city_name in mappings:
-            result[city_name] = mappings[city_name]
-
-    return result
+    return {name: _COUNTRY_MAPPINGS[name] for name in city_names if name in _COUNTRY_MAPPINGS}
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import os
+import random
+from typing import Any, Dict, Union
+import httpx
+import orjson
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = int(os.getenv("MAX_RETRIES", "1"))
+
+# Errors from an upstream call or from parsing its (possibly malformed) response.
+# Callers catch these to fall back; anything else is a bug and should propagate.
+# orjson.JSONDecodeError is a ValueError, as are the shape errors raised below
+UPSTREAM_ERRORS = (httpx.HTTPError, ValueError, KeyError)
+
+# Statuses worth retrying: rate limiting and transient upstream failures
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Network errors worth retrying: a pooled connection dropped mid-request. Failed connects
+# are already retried once by the client's transport, and timeouts aren't retried at all,
+# since another full timeout would push a slow upstream past the latency budget
+_RETRY_ERRORS = (httpx.ReadError, httpx.WriteError, httpx.RemoteProtocolError)
+
+
+async def request_with_retry(client: httpx.AsyncClient, method: str, url: str, stream: bool = False, **kwargs) -> httpx.Response:
+    """
+    Send a request, retrying dropped connections and 429/5xx responses with exponential backoff.
+
+    Makes at most MAX_RETRIES + 1 attempts. The final response is returned (or the final
+    network error raised) so callers can raise_for_status() and fall back as before.
+    Timeouts and other transport errors are raised immediately.
+    With stream=True the body isn't read; the caller must aclose() the response.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        last_attempt = attempt == MAX_RETRIES
+        try:
+            if stream:
+                response = await client.send(client.build_request(method, url, **kwargs), stream=True)
+            else:
+                response = await client.request(method, url, **kwargs)
+        except _RETRY_ERRORS as e:
+            if last_attempt:
+                logger.warning("%s %s failed after %d attempts: %s", method, url, attempt + 1, e)
+                raise
+        else:
+            if response.status_code not in _RETRY_STATUSES:
+                return response
+            if last_attempt:
+                logger.warning("%s %s failed after %d attempts: HTTP %d", method, url, attempt + 1, response.status_code)
+                return response
+            if stream:
+                # Release the connection before retrying
+                await response.aclose()
+
+        # 100ms, 200ms, 400ms... capped at 500ms, plus jitter to spread out retries
+        await asyncio.sleep(min(0.1 * 2 ** attempt, 0.5) + random.uniform(0, 0.05))
+
+
+def parse_json_object(data: Union[bytes, str]) -> Dict[str, Any]:
+    """Parse JSON that must be an object, raising ValueError for anything else."""
+    parsed = orjson.loads(data)
+    if not isinstance(parsed, dict):
+        raise ValueError(f"expected a JSON object, got {type(parsed).__name__}")
+    return parsed
+
+
+def completion_content(result: Dict[str, Any]) -> str:
+    """Return the message content of a parsed chat/completions response, raising ValueError if malformed."""
+    choices = result.get("choices")
+    if not isinstance(choices, list) or not choices or not isinstance(choices[0], dict):
+        raise ValueError("completion response has no choices")
+    message = choices[0].get("message")
+    content = message.get("content") if isinstance(message, dict) else None
+    if not isinstance(content, str):
+        raise ValueError("completion response has no message content")
+    return content
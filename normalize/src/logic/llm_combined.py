@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Literal, Optional, Tuple
+import httpx
+import orjson
+from .cache import LRUCache, make_cache_key
+from .http_utils import UPSTREAM_ERRORS, completion_content, parse_json_object, request_with_retry
+from .categorizer import CATEGORY_RULES, _fallback_categorize
+from .extract_contact import CONTACT_RULES, _clean_contact, _fallback_extract_contact, extract_contact
+
+logger = logging.getLogger(__name__)
+
+_MODEL = "gpt-4o-mini"
+
+# Fixed chat/completions fields; only the messages change per call
+_BODY_TEMPLATE = {"model": _MODEL, "temperature": 0, "max_tokens": 200, "response_format": {"type": "json_object"}}
+
+# Most messages one batched call covers; max_tokens grows with the batch, so larger
+# batches would run into the model's output limit and the request timeout
+MAX_BATCH_SIZE = 16
+
+# Keyed on the full prompt, so a prompt or model change invalidates old entries
+_COMBINED_CACHE = LRUCache(maxsize=10_000)
+
+
+async def classify_and_extract(text: str, client: httpx.AsyncClient) -> Tuple[Literal["urgent", "high_risk", "base"], Dict[str, Optional[str]]]:
+    """
+    Categorize text and extract contact information with a single OpenAI call.
+
+    Returns (category, contact) in the same shapes as categorize() and extract_contact(),
+    falling back to their keyword/regex fallbacks if the API call fails.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set")
+
+    # High-risk keywords settle the category without the LLM; only contact extraction needs it
+    if _fallback_categorize(text) == "high_risk":
+        return "high_risk", await extract_contact(text, client)
+
+    prompt = _build_prompt(text)
+
+    cache_key = make_cache_key(_MODEL, prompt)
+    cached = _COMBINED_CACHE.get(cache_key)
+    if cached is not None:
+        return cached[0], dict(cached[1])
+
+    try:
+        parsed = await _request_completion(prompt, _BODY_TEMPLATE["max_tokens"], api_key, client)
+        category, contact = _parse_result(parsed)
+
+        _COMBINED_CACHE.set(cache_key, (category, contact))
+        return category, dict(contact)
+
+    except UPSTREAM_ERRORS as e:
+        # Fallback to keyword/regex extraction if API fails (not cached)
+        logger.warning("OpenAI classify-and-extract failed, using keyword/regex fallback: %s", e)
+        return _fallback_categorize(text), _fallback_extract_contact(text)
+
+
+async def classify_and_extract_many(texts: List[str], client: httpx.AsyncClient) -> List[Tuple[Literal["urgent", "high_risk", "base"], Dict[str, Optional[str]]]]:
+    """
+    Batch version of classify_and_extract: one OpenAI call covers every text that needs the LLM.
+
+    Cached and high-risk texts take the same fast paths as classify_and_extract.
+    Results are returned in input order. Batched results aren't cached, since they
+    come from a different prompt than the single-message cache key describes.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set")
+
+    batch_indexes = [
+        i for i, text in enumerate(texts)
+        if _fallback_categorize(text) != "high_risk"
+        and _COMBINED_CACHE.get(make_cache_key(_MODEL, _build_prompt(text))) is None
+    ]
+    if len(batch_indexes) < 2:
+        return list(await asyncio.gather(*(classify_and_extract(text, client) for text in texts)))
+
+    results: List[Any] = [None] * len(texts)
+    other_indexes = [i for i in range(len(texts)) if i not in batch_indexes]
+    other_results = await asyncio.gather(*(classify_and_extract(texts[i], client) for i in other_indexes))
+    for i, result in zip(other_indexes, other_results):
+        results[i] = result
+
+    batch_texts = [texts[i] for i in batch_indexes]
+    # Encoded as JSON, so quotes or newlines in a message can't pose as another message
+    message_ids = [str(n) for n in range(1, len(batch_texts) + 1)]
+    messages = orjson.dumps(dict(zip(message_ids, batch_texts))).decode()
+    prompt = f"""Classify each of these travel advisor messages and extract each sender's contact information.
+
+CATEGORY: exactly one of "urgent", "high_risk", or "base".
+
+{CATEGORY_RULES}
+
+CONTACT: an object with these fields:
+{CONTACT_RULES}
+
+Messages, as a JSON object mapping each message id to its text:
+{messages}
+
+Return ONLY a JSON object with exactly one result per message id:
+{{"results": {{"<message id>": {{"category": "urgent" | "high_risk" | "base", "contact": {{"first_name": ..., "last_name": ..., "email": ..., "phone": ..., "zip": ...}}}}, ...}}}}"""
+
+    try:
+        parsed = await _request_completion(prompt, _BODY_TEMPLATE["max_tokens"] * len(batch_texts), api_key, client)
+        batch_results = parsed["results"]
+        if not isinstance(batch_results, dict):
+            raise ValueError("results is not an object")
+        if set(batch_results) != set(message_ids):
+            raise ValueError(f"expected results for message ids {message_ids}, got {sorted(batch_results)}")
+
+        for i, message_id in zip(batch_indexes, message_ids):
+            category, contact = _parse_result(batch_results[message_id])
+            results[i] = (category, dict(contact))
+
+    except UPSTREAM_ERRORS as e:
+        # Fallback to keyword/regex extraction if API fails (not cached)
+        logger.warning("Batched OpenAI classify-and-extract failed, using keyword/regex fallback: %s", e)
+        for i, text in zip(batch_indexes, batch_texts):
+            results[i] = (_fallback_categorize(text), _fallback_extract_contact(text))
+
+    return results
+
+
+def _build_prompt(text: str) -> str:
+    """Build the single-message classify-and-extract prompt."""
+    return f"""Classify this travel advisor message and extract the sender's contact information.
+
+CATEGORY: exactly one of "urgent", "high_risk", or "base".
+
+{CATEGORY_RULES}
+
+CONTACT: an object with these fields:
+{CONTACT_RULES}
+
+Message: "{text}"
+
+Return ONLY a JSON object of the form:
+{{"category": "urgent" | "high_risk" | "base", "contact": {{"first_name": ..., "last_name": ..., "email": ..., "phone": ..., "zip": ...}}}}"""
+
+
+async def _request_completion(prompt: str, max_tokens: int, api_key: str, client: httpx.AsyncClient) -> Dict[str, Any]:
+    """Send a JSON-mode chat completion and return the parsed JSON content."""
+    response = await request_with_retry(
+        client,
+        "POST",
+        "https://api.openai.com/v1/chat/completions",
+        headers={
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        },
+        content=orjson.dumps({**_BODY_TEMPLATE, "max_tokens": max_tokens, "messages": [{"role": "user", "content": prompt}]}),
+        timeout=10.0
+    )
+    response.raise_for_status()
+
+    return parse_json_object(completion_content(parse_json_object(response.content)))
+
+
+def _parse_result(parsed: Dict[str, Any]) -> Tuple[Literal["urgent", "high_risk", "base"], Dict[str, Optional[str]]]:
+    """Validate one {category, contact} object returned by the LLM."""
+    if not isinstance(parsed, dict):
+        raise ValueError(f"expected a result object, got {type(parsed).__name__}")
+
+    category = str(parsed.get("category", "")).strip().lower()
+    if category not in ["urgent", "high_risk", "base"]:
+        category = "base"
+
+    contact_data = parsed.get("contact")
+    contact = _clean_contact(contact_data if isinstance(contact_data, dict) else {})
+    return category, contact
@@ -1,23 +1,28 @@
 import re
 from typing import List
 
+# Compiled once at import instead of going through re's pattern cache on every call
+_WHITESPACE_RE = re.compile(r'\s+')
+_NON_DIGIT_RE = re.compile(r'\D')
+_EMAIL_RE = re.compile(r'[\w\.\+\-]+@[\w\.\-]+\.\w+')
+_ZIP_RE = re.compile(r'^\d{5}$')
+
 
 def normalize_text(text: str) -> str:
     """Normalize text by removing extra whitespace and converting to lowercase."""
-    return re.sub(r'\s+', ' ', text.strip().lower())
+    return _WHITESPACE_RE.sub(' ', text.strip().lower())
 
 
 def extract_phone_digits(phone: str) -> str:
     """Extract only digits from phone number."""
-    return re.sub(r'\D', '', phone)
+    return _NON_DIGIT_RE.sub('', phone)
 
 
 def is_valid_email(email: str) -> bool:
     """Check if email format is valid."""
-    pattern = r'[\w\.\+\-]+@[\w\.\-]+\.\w+'
-    return bool(re.match(pattern, email))
+    return bool(_EMAIL_RE.match(email))
 
 
 def is_valid_zip(zip_code: str) -> bool:
     """Check if ZIP code is valid US 5-digit format."""
-    return bool(re.match(r'^\d{5}$', zip_code))
+    return bool(_ZIP_RE.match(zip_code))
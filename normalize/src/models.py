@@ -28,6 +28,14 @@ class NormalizeIn(BaseModel):
     text: str
 
 
+# Most messages one /normalize/batch call accepts
+MAX_BATCH_ITEMS = 100
+
+
+class NormalizeBatchIn(BaseModel):
+    items: List[NormalizeIn] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+
+
 class NormalizeOut(BaseModel):
     message_id: str
     category: Literal["urgent", "high_risk", "base"]
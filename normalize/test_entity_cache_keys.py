@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Check that entity cache keys keep different messages apart.
+
+Runs without the API server or an OpenAI key:
+    python test_entity_cache_keys.py
+"""
+from src.logic.extract_entities import _entity_cache_key, _near_duplicate_key
+
+def test_non_ascii_words_do_not_collide():
+    """Messages differing only in a non-ASCII word must not share a near-duplicate key."""
+    moscow = _near_duplicate_key("Hello, flying to Москва tomorrow")
+    kyiv = _near_duplicate_key("Hello, flying to Киев tomorrow")
+    assert moscow is not None and kyiv is not None
+    assert moscow != kyiv
+
+    assert _near_duplicate_key("Lost my passport in Zürich") != _near_duplicate_key("Lost my passport in Z rich")
+
+def test_punctuation_variants_share_a_key():
+    """Messages differing only in punctuation and spacing map to one near-duplicate key."""
+    assert _near_duplicate_key("Planning Rome in October!") == _near_duplicate_key("planning rome, in october")
+    assert _near_duplicate_key("Lost my passport—help!") == _near_duplicate_key("lost my passport... help")
+
+def test_reordered_words_do_not_collide():
+    """Swapping words between place names changes the entities, so it must change the key."""
+    assert _near_duplicate_key("Flying from North Korea to South Africa tomorrow") != \
+        _near_duplicate_key("Flying from South Korea to North Africa tomorrow")
+    assert _near_duplicate_key("Going to York, then New Orleans") != _near_duplicate_key("Going to New York, then Orleans")
+    assert _near_duplicate_key("planning Rome in October") != _near_duplicate_key("in October, planning Rome")
+
+def test_unkeyable_text_has_no_near_duplicate_key():
+    """Digits and characters the word key would drop fall back to exact matching only."""
+    assert _near_duplicate_key("Call me 661248083") is None
+    assert _near_duplicate_key("Flying to Paris ✈ tomorrow") is None
+    assert _entity_cache_key("Flying to Paris ✈ tomorrow") != _entity_cache_key("Flying to Paris tomorrow")
+
+if __name__ == "__main__":
+    test_non_ascii_words_do_not_collide()
+    test_punctuation_variants_share_a_key()
+    test_reordered_words_do_not_collide()
+    test_unkeyable_text_has_no_near_duplicate_key()
+    print("✅ PASS: Entity cache keys")
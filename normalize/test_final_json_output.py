@@ -3,8 +3,8 @@
 Final test - run all test cases and show complete JSON output.
 """
 import asyncio
-import json
 import httpx
+import orjson
 
 API_BASE_URL = "http://localhost:8080"
 
@@ -22,7 +22,7 @@ TEST_CASES = [
     "I'm in Ls Anglees, need to travel to Toronto. I am feeling very scared and want to leave immediately. Call me 818900600"
 ]
 
-async def test_all_cases():
+async def check_all_cases():
     """Test all cases and print complete JSON responses."""
 
     # Check if server is running
@@ -36,31 +36,35 @@ async def test_all_cases():
         print("ERROR: API server not responding")
         return
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        for i, text in enumerate(TEST_CASES, 1):
-            try:
-                response = await client.post(f"{API_BASE_URL}/normalize", json={
-                    "message_id": f"test-case-{i}",
-                    "text": text
-                })
+    # Send every case at once; the total time is roughly that of the slowest case
+    limits = httpx.Limits(max_connections=len(TEST_CASES))
+    async with httpx.AsyncClient(timeout=30.0, limits=limits) as client:
+        responses = await asyncio.gather(*[
+            client.post(f"{API_BASE_URL}/normalize", json={
+                "message_id": f"test-case-{i}",
+                "text": text
+            })
+            for i, text in enumerate(TEST_CASES, 1)
+        ], return_exceptions=True)
 
-                if response.status_code == 200:
-                    result = response.json()
-                    print(f"Test Case {i}:")
-                    print(f"Text: \"{text}\"")
-                    print("JSON Response:")
-                    print(json.dumps(result, indent=2))
-                    print()
-                else:
-                    print(f"Test Case {i} FAILED:")
-                    print(f"Text: \"{text}\"")
-                    print(f"Status: {response.status_code}")
-                    print(f"Response: {response.text}")
-                    print()
-
-            except Exception as e:
-                print(f"Test Case {i} ERROR: {e}")
-                print()
+    # Print in test case order
+    for i, (text, response) in enumerate(zip(TEST_CASES, responses), 1):
+        if isinstance(response, Exception):
+            print(f"Test Case {i} ERROR: {response}")
+            print()
+        elif response.status_code == 200:
+            result = orjson.loads(response.content)
+            print(f"Test Case {i}:")
+            print(f"Text: \"{text}\"")
+            print("JSON Response:")
+            print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
+            print()
+        else:
+            print(f"Test Case {i} FAILED:")
+            print(f"Text: \"{text}\"")
+            print(f"Status: {response.status_code}")
+            print(f"Response: {response.text}")
+            print()
 
 if __name__ == "__main__":
-    asyncio.run(test_all_cases())
\ No newline at end of file
+    asyncio.run(check_all_cases())
\ No newline at end of file
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Check local phone number and ZIP code typo detection against known inputs.
+
+Runs without the API server or an OpenAI key:
+    python test_local_typos.py
+"""
+from src.logic.extract_entities import _local_typos
+
+# (text, expected phone_number_typo, expected zip_code_typo)
+CASES = [
+    # Phone numbers with the wrong digit count
+    ("Call me 661248083", "661248083", None),
+    ("call 661-248-083 now", "661248083", None),
+    ("(917) 555-123", "917555123", None),
+    ("Call me 818900600.", "818900600", None),
+    ("my phone is +1 917 555 123", "1917555123", None),
+    # Valid phone numbers, with and without country codes
+    ("Hi Fora, I'm Alex Smith (917-555-1234) in 10003.", None, None),
+    ("+1 917 555 1234", None, None),
+    ("call 1 917 555 1234", None, None),
+    ("+44 20 7946 0958", None, None),
+    # ZIP codes
+    ("zip 02139-1234", None, None),
+    ("zip code: 1234567", None, "1234567"),
+    ("my zip is 1000", None, "1000"),
+    ("10003 zip", None, None),
+    # Long numbers that aren't phone numbers
+    ("booking ref 12345678", None, None),
+    ("order #1234567", None, None),
+    ("card ending 4242 4242", None, None),
+    ("arriving 12 15 2024", None, None),
+    ("flying 2024-10-15", None, None),
+    ("flight in 3 h, need assistance", None, None),
+]
+
+def test_local_typos():
+    """Every case reports exactly the expected phone and ZIP typos."""
+    for text, phone_typo, zip_typo in CASES:
+        assert _local_typos(text) == {"phone_number_typo": phone_typo, "zip_code_typo": zip_typo}, text
+
+if __name__ == "__main__":
+    test_local_typos()
+    print("✅ PASS: Local phone/ZIP typo detection")
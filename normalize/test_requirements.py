@@ -4,19 +4,32 @@ Test the production requirements for the normalize-bot API.
 
 Requirements tested:
 1. Latency p95 ≤ 20s (NYC → endpoint)
-2. Stability: 200 sequential requests, < 1% non-2xx
+2. Stability: 200 requests, < 1% non-2xx
 3. HTTP errors: Informative JSON bodies
 4. Secrets: Only via environment variables
 """
 import asyncio
+import math
 import os
+import random
+import re
 import time
 import statistics
-import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import List, Dict, Any
 import httpx
+import orjson
 from dotenv import load_dotenv
 
+from src.models import MAX_BATCH_ITEMS
+
+try:
+    import uvloop
+except ImportError:  # uvloop isn't available on Windows
+    uvloop = None
+
 # Load environment variables
 load_dotenv()
 
@@ -24,6 +37,36 @@ load_dotenv()
 API_BASE_URL = "http://localhost:8080"
 TEST_REQUESTS = 200
 LATENCY_THRESHOLD_SECONDS = 20.0
+# Mean offered load (requests/second) for the load test. Requests are sent on a
+# Poisson schedule at this rate regardless of how fast responses come back
+REQUEST_RATE = 10.0
+# Messages per load test request; above 1, messages are grouped into /normalize/batch calls.
+# Must be between 1 and MAX_BATCH_ITEMS, the most items /normalize/batch accepts; checked in main()
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "1"))
+# How long to wait for a freshly started API server to answer /healthz
+SERVER_START_TIMEOUT_SECONDS = 15.0
+
+# One client for every test, so connections are reused across all requests instead of
+# reopened per test. HTTP/2 is used when the endpoint offers it (https only)
+CLIENT = httpx.AsyncClient(
+    base_url=API_BASE_URL,
+    http2=True,
+    limits=httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=90),
+    timeout=30.0
+)
+
+# Neither changes while the harness runs, so both are read once at import
+API_KEY = os.environ.get("OPENAI_API_KEY")
+SOURCE_FILES = tuple(Path("src").rglob("*.py"))
+
+# Hardcoded secret patterns, compiled once into a single alternation so each
+# source file is scanned in one pass, as raw bytes without decoding
+SECRET_PATTERN = re.compile(
+    rb'sk-[a-zA-Z0-9]{32,}'  # OpenAI API keys
+    rb'|OPENAI_API_KEY\s*=\s*["\'][^"\']+["\']'  # Hardcoded API key assignments
+    rb'|api[_-]?key\s*=\s*["\'][^"\']+["\']',  # Generic API key assignments
+    re.IGNORECASE
+)
 
 # Test messages for requests
 TEST_MESSAGES = [
@@ -36,104 +79,130 @@ TEST_MESSAGES = [
     "I am going to eat at Olive Garden in the 48410 zip code, and I need to get to the airport in 2 hours."
 ]
 
-async def test_latency_requirement():
-    """Test latency p95 ≤ 20s requirement."""
-    print("=" * 60)
-    print("TESTING LATENCY REQUIREMENT (p95 ≤ 20s)")
-    print("=" * 60)
-
-    latencies = []
-    success_count = 0
-
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        for i in range(50):  # Test with 50 requests for p95 calculation
-            message = TEST_MESSAGES[i % len(TEST_MESSAGES)]
-
-            start_time = time.time()
-            try:
-                response = await client.post(f"{API_BASE_URL}/normalize", json={
-                    "message_id": f"test-latency-{i}",
-                    "text": message
-                })
-                end_time = time.time()
-                latency = end_time - start_time
-                latencies.append(latency)
-
-                if response.status_code == 200:
-                    success_count += 1
-
-                print(f"Request {i+1}/50: {latency:.2f}s (Status: {response.status_code})")
-
-            except Exception as e:
-                end_time = time.time()
-                latency = end_time - start_time
-                latencies.append(latency)
-                print(f"Request {i+1}/50: {latency:.2f}s (Error: {str(e)})")
-
-    # Calculate statistics
-    if latencies:
-        p95_latency = statistics.quantiles(latencies, n=20)[18]  # 95th percentile
-        avg_latency = statistics.mean(latencies)
-        max_latency = max(latencies)
-        min_latency = min(latencies)
-
-        print(f"\nLATENCY RESULTS:")
-        print(f"  Requests completed: {len(latencies)}")
-        print(f"  Successful responses: {success_count}")
-        print(f"  Average latency: {avg_latency:.2f}s")
-        print(f"  Min latency: {min_latency:.2f}s")
-        print(f"  Max latency: {max_latency:.2f}s")
-        print(f"  P95 latency: {p95_latency:.2f}s")
-        print(f"  Threshold: {LATENCY_THRESHOLD_SECONDS}s")
-
-        if p95_latency <= LATENCY_THRESHOLD_SECONDS:
-            print(f"  ✅ PASS: P95 latency ({p95_latency:.2f}s) ≤ {LATENCY_THRESHOLD_SECONDS}s")
-            return True
-        else:
-            print(f"  ❌ FAIL: P95 latency ({p95_latency:.2f}s) > {LATENCY_THRESHOLD_SECONDS}s")
-            return False
-    else:
-        print("  ❌ FAIL: No latency data collected")
-        return False
+# Load test request bodies, serialized once at import so sending a request does no
+# payload work. Message ids stay unique per request
+PAYLOADS = [
+    orjson.dumps({"message_id": f"test-load-{i}", "text": TEST_MESSAGES[i % len(TEST_MESSAGES)]})
+    for i in range(TEST_REQUESTS)
+]
 
-async def test_stability_requirement():
-    """Test stability: 200 sequential requests, < 1% non-2xx."""
-    print("\n" + "=" * 60)
-    print("TESTING STABILITY REQUIREMENT (200 requests, < 1% non-2xx)")
+def build_load_requests(batch_size: int) -> List[Any]:
+    """(path, body, message indexes) for each load test request."""
+    if batch_size > 1:
+        return [
+            (
+                "/normalize/batch",
+                b'{"items":[' + b",".join(PAYLOADS[start:start + batch_size]) + b"]}",
+                range(start, min(start + batch_size, TEST_REQUESTS))
+            )
+            for start in range(0, TEST_REQUESTS, batch_size)
+        ]
+    return [("/normalize", payload, range(i, i + 1)) for i, payload in enumerate(PAYLOADS)]
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """
+    Nearest-rank percentile: the smallest observed value with at least p% of
+    samples at or below it. Never interpolates, so small samples report a real latency.
+    """
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+async def check_load(client: httpx.AsyncClient):
+    """
+    Test latency p95 ≤ 20s and stability (200 requests, < 1% non-2xx) from one run.
+
+    Both requirements are measured on the same TEST_REQUESTS requests, so the p95
+    comes from the full 200-sample run. Returns (latency_pass, stability_pass).
+
+    Requests are sent open-loop: each one goes out at its scheduled time whether or
+    not earlier ones have finished, and its latency is measured from that scheduled
+    time. A slow server therefore shows up as queueing in the results instead of
+    quietly lowering the request rate (coordinated omission).
+
+    With BATCH_SIZE > 1 each request carries several messages, and every message
+    in a batch is assigned the batch's status and full latency.
+    """
+    print("=" * 60)
+    print(f"TESTING LATENCY AND STABILITY REQUIREMENTS (p95 ≤ {LATENCY_THRESHOLD_SECONDS:.0f}s, {TEST_REQUESTS} requests, < 1% non-2xx)")
     print("=" * 60)
 
-    success_count = 0
-    error_count = 0
-    status_codes = {}
-
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        for i in range(TEST_REQUESTS):
-            message = TEST_MESSAGES[i % len(TEST_MESSAGES)]
-
-            try:
-                response = await client.post(f"{API_BASE_URL}/normalize", json={
-                    "message_id": f"test-stability-{i}",
-                    "text": message
-                })
+    # Built before the run starts so payload work stays out of the timed section
+    load_requests = build_load_requests(BATCH_SIZE)
+
+    # Send times (seconds from the start of the run) with exponential inter-arrival gaps
+    schedule = []
+    send_at = 0.0
+    for _ in load_requests:
+        send_at += random.expovariate(REQUEST_RATE)
+        schedule.append(send_at)
+
+    # Per message, filled by index as requests finish; perf_counter is monotonic, so clock adjustments can't skew it.
+    # latencies are measured from the scheduled send time, service_times from the actual one
+    latencies = [0.0] * TEST_REQUESTS
+    service_times = [0.0] * TEST_REQUESTS
+    # None for requests that raised instead of returning a response
+    statuses: List[Any] = [None] * TEST_REQUESTS
+
+    async def send(j):
+        path, body, indexes = load_requests[j]
+        status_code = None
+        start_time = time.perf_counter()
+        try:
+            response = await client.post(path, content=body, headers=JSON_HEADERS)
+            status_code = response.status_code
 
-                status_code = response.status_code
-                status_codes[status_code] = status_codes.get(status_code, 0) + 1
+            if not 200 <= status_code < 300:
+                print(f"Request {j+1}: Non-2xx response {status_code}")
 
-                if 200 <= status_code < 300:
-                    success_count += 1
-                else:
-                    error_count += 1
-                    print(f"Request {i+1}: Non-2xx response {status_code}")
+        except Exception as e:
+            print(f"Request {j+1}: Exception - {str(e)}")
 
-                if (i + 1) % 10 == 0:
-                    success_rate_so_far = (success_count / (i + 1)) * 100
-                    print(f"Progress: {i+1}/{TEST_REQUESTS} requests completed - Success rate: {success_rate_so_far:.1f}%")
+        end_time = time.perf_counter()
+        for i in indexes:
+            statuses[i] = status_code
+            latencies[i] = end_time - (run_start + schedule[j])
+            service_times[i] = end_time - start_time
 
-            except Exception as e:
-                error_count += 1
-                print(f"Request {i+1}: Exception - {str(e)}")
+    if BATCH_SIZE > 1:
+        print(f"Sending {TEST_REQUESTS} messages in {len(load_requests)} batches of up to {BATCH_SIZE} at ~{REQUEST_RATE:.0f} requests/s...")
+    else:
+        print(f"Sending {TEST_REQUESTS} requests at ~{REQUEST_RATE:.0f} requests/s...")
+    tasks = []
+    run_start = time.perf_counter()
+    for j, send_at in enumerate(schedule):
+        await asyncio.sleep(max(0.0, run_start + send_at - time.perf_counter()))
+        tasks.append(asyncio.create_task(send(j)))
+    await asyncio.gather(*tasks)
+
+    # Latency results
+    sorted_latencies = sorted(latencies)
+    p50_latency = percentile(sorted_latencies, 50)
+    p90_latency = percentile(sorted_latencies, 90)
+    p95_latency = percentile(sorted_latencies, 95)
+    p99_latency = percentile(sorted_latencies, 99)
+
+    print(f"\nLATENCY RESULTS:")
+    print(f"  Requests completed: {len(latencies)}")
+    print(f"  Offered load: {REQUEST_RATE:.1f} requests/s (sampled schedule: {len(schedule) / schedule[-1]:.1f} requests/s)")
+    print(f"  Average latency: {statistics.mean(latencies):.2f}s")
+    print(f"  Min latency: {sorted_latencies[0]:.2f}s")
+    print(f"  Max latency: {sorted_latencies[-1]:.2f}s")
+    print(f"  P50/P90/P95/P99 latency: {p50_latency:.2f}s / {p90_latency:.2f}s / {p95_latency:.2f}s / {p99_latency:.2f}s")
+    print(f"  P95 service time (excluding time queued behind the schedule): {percentile(sorted(service_times), 95):.2f}s")
+    print(f"  Threshold: {LATENCY_THRESHOLD_SECONDS}s")
+
+    latency_pass = p95_latency <= LATENCY_THRESHOLD_SECONDS
+    if latency_pass:
+        print(f"  ✅ PASS: P95 latency ({p95_latency:.2f}s) ≤ {LATENCY_THRESHOLD_SECONDS}s")
+    else:
+        print(f"  ❌ FAIL: P95 latency ({p95_latency:.2f}s) > {LATENCY_THRESHOLD_SECONDS}s")
 
-    # Calculate results
+    # Stability results, tallied once after the run rather than per request
+    status_codes = Counter(status_code for status_code in statuses if status_code is not None)
+    success_count = sum(count for status_code, count in status_codes.items() if 200 <= status_code < 300)
+    error_count = TEST_REQUESTS - success_count
     error_rate = (error_count / TEST_REQUESTS) * 100
     success_rate = (success_count / TEST_REQUESTS) * 100
 
@@ -143,16 +212,17 @@ async def test_stability_requirement():
     print(f"  Non-2xx/Errors: {error_count}")
     print(f"  Success rate: {success_rate:.1f}%")
     print(f"  Error rate: {error_rate:.1f}%")
-    print(f"  Status code breakdown: {status_codes}")
+    print(f"  Status code breakdown: {dict(status_codes)}")
 
-    if error_rate < 1.0:
+    stability_pass = error_rate < 1.0
+    if stability_pass:
         print(f"  ✅ PASS: Error rate ({error_rate:.1f}%) < 1%")
-        return True
     else:
         print(f"  ❌ FAIL: Error rate ({error_rate:.1f}%) ≥ 1%")
-        return False
 
-async def test_http_errors_requirement():
+    return latency_pass, stability_pass
+
+async def check_http_errors_requirement(client: httpx.AsyncClient):
     """Test HTTP errors have informative JSON bodies."""
     print("\n" + "=" * 60)
     print("TESTING HTTP ERRORS REQUIREMENT (Informative JSON bodies)")
@@ -176,59 +246,64 @@ async def test_http_errors_requirement():
         }
     ]
 
+    def send(test_case):
+        if isinstance(test_case['data'], str):
+            # Send raw string for invalid JSON test
+            return client.post(
+                "/normalize",
+                content=test_case['data'],
+                headers=test_case['headers']
+            )
+        return client.post("/normalize", json=test_case['data'])
+
+    # The cases are independent, so send them together and check the responses in order
+    responses = await asyncio.gather(*(send(test_case) for test_case in test_cases), return_exceptions=True)
+
     all_passed = True
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        for i, test_case in enumerate(test_cases):
-            print(f"\nTest {i+1}: {test_case['name']}")
+    for i, (test_case, response) in enumerate(zip(test_cases, responses)):
+        print(f"\nTest {i+1}: {test_case['name']}")
 
+        try:
+            if isinstance(response, Exception):
+                raise response
+
+            print(f"  Status Code: {response.status_code}")
+
+            # Check if response has JSON content type
+            content_type = response.headers.get("content-type", "")
+            if "application/json" not in content_type:
+                print(f"  ❌ FAIL: Response not JSON (Content-Type: {content_type})")
+                all_passed = False
+                continue
+
+            # Try to parse JSON response
             try:
-                if isinstance(test_case['data'], str):
-                    # Send raw string for invalid JSON test
-                    response = await client.post(
-                        f"{API_BASE_URL}/normalize",
-                        content=test_case['data'],
-                        headers=test_case['headers']
-                    )
-                else:
-                    response = await client.post(f"{API_BASE_URL}/normalize", json=test_case['data'])
+                error_body = orjson.loads(response.content)
+                print(f"  Response body: {orjson.dumps(error_body, option=orjson.OPT_INDENT_2).decode()}")
 
-                print(f"  Status Code: {response.status_code}")
+                # Check if error body is informative
+                if isinstance(error_body, dict):
+                    has_error_field = "error" in error_body
+                    has_detail_field = "detail" in error_body
 
-                # Check if response has JSON content type
-                content_type = response.headers.get("content-type", "")
-                if "application/json" not in content_type:
-                    print(f"  ❌ FAIL: Response not JSON (Content-Type: {content_type})")
-                    all_passed = False
-                    continue
-
-                # Try to parse JSON response
-                try:
-                    error_body = response.json()
-                    print(f"  Response body: {json.dumps(error_body, indent=2)}")
-
-                    # Check if error body is informative
-                    if isinstance(error_body, dict):
-                        has_error_field = "error" in error_body
-                        has_detail_field = "detail" in error_body
-
-                        if has_error_field or has_detail_field:
-                            print(f"  ✅ PASS: Informative JSON error body")
-                        else:
-                            print(f"  ❌ FAIL: JSON body lacks error information")
-                            all_passed = False
+                    if has_error_field or has_detail_field:
+                        print(f"  ✅ PASS: Informative JSON error body")
                     else:
-                        print(f"  ❌ FAIL: JSON body is not an object")
+                        print(f"  ❌ FAIL: JSON body lacks error information")
                         all_passed = False
-
-                except json.JSONDecodeError:
-                    print(f"  ❌ FAIL: Response body is not valid JSON")
+                else:
+                    print(f"  ❌ FAIL: JSON body is not an object")
                     all_passed = False
 
-            except Exception as e:
-                print(f"  ❌ FAIL: Exception during request - {str(e)}")
+            except orjson.JSONDecodeError:
+                print(f"  ❌ FAIL: Response body is not valid JSON")
                 all_passed = False
 
+        except Exception as e:
+            print(f"  ❌ FAIL: Exception during request - {str(e)}")
+            all_passed = False
+
     if all_passed:
         print(f"\n  ✅ PASS: All HTTP errors have informative JSON bodies")
     else:
@@ -236,7 +311,22 @@ async def test_http_errors_requirement():
 
     return all_passed
 
-def test_secrets_requirement():
+def scan_file(file_path: Path) -> List[str]:
+    """Return the potential hardcoded secrets found in one source file."""
+    try:
+        content = file_path.read_bytes()
+    except OSError as e:
+        print(f"Warning: Could not scan {file_path}: {e}")
+        return []
+
+    # A match is fine if the file reads its keys from the environment, unless it's a literal key
+    return [
+        f"Potential hardcoded secret in {file_path}: {match[:20].decode(errors='replace')}..."
+        for match in SECRET_PATTERN.findall(content)
+        if b'os.getenv' not in content or b'sk-' in match
+    ]
+
+def check_secrets_requirement():
     """Test secrets are only via environment variables."""
     print("\n" + "=" * 60)
     print("TESTING SECRETS REQUIREMENT (Only via environment variables)")
@@ -245,43 +335,18 @@ def test_secrets_requirement():
     issues_found = []
 
     # Check if API key is in environment
-    api_key = os.getenv("OPENAI_API_KEY")
-    if api_key:
-        print(f"✅ OPENAI_API_KEY found in environment (starts with: {api_key[:10]}...)")
+    if API_KEY:
+        print(f"✅ OPENAI_API_KEY found in environment (starts with: {API_KEY[:10]}...)")
     else:
         issues_found.append("OPENAI_API_KEY not found in environment")
 
     # Check source code for hardcoded secrets (basic scan)
-    import re
+    print(f"\nScanning {len(SOURCE_FILES)} source files for hardcoded secrets...")
 
-    secret_patterns = [
-        r'sk-[a-zA-Z0-9]{32,}',  # OpenAI API keys
-        r'OPENAI_API_KEY\s*=\s*["\'][^"\']+["\']',  # Hardcoded API key assignments
-        r'api[_-]?key\s*=\s*["\'][^"\']+["\']',  # Generic API key assignments
-    ]
-
-    source_files = []
-    for root, dirs, files in os.walk('src'):
-        for file in files:
-            if file.endswith('.py'):
-                source_files.append(os.path.join(root, file))
-
-    print(f"\nScanning {len(source_files)} source files for hardcoded secrets...")
-
-    for file_path in source_files:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-                for pattern in secret_patterns:
-                    matches = re.findall(pattern, content, re.IGNORECASE)
-                    if matches:
-                        # Check if it's just a reference to environment variable (not hardcoded)
-                        for match in matches:
-                            if 'os.getenv' not in content or 'sk-' in match:
-                                issues_found.append(f"Potential hardcoded secret in {file_path}: {match[:20]}...")
-        except Exception as e:
-            print(f"Warning: Could not scan {file_path}: {e}")
+    # File reads release the GIL, so a thread pool overlaps them
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        for file_issues in executor.map(scan_file, SOURCE_FILES):
+            issues_found.extend(file_issues)
 
     # Check .env file contains secrets (this is OK for development)
     env_file_path = '.env'
@@ -297,21 +362,21 @@ def test_secrets_requirement():
             print(f"  - {issue}")
         return False
 
-async def start_api_server():
+async def start_api_server(client: httpx.AsyncClient):
     """Start the API server for testing."""
     print("Starting API server...")
 
     # Check if server is already running
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{API_BASE_URL}/healthz")
-            if response.status_code == 200:
-                print("✅ API server is already running")
-                return True
+        response = await client.get("/healthz", timeout=5.0)
+        if response.status_code == 200:
+            print("✅ API server is already running")
+            return True
     except:
         pass
 
     # Start server in background
+    import atexit
     import subprocess
     import sys
 
@@ -319,22 +384,35 @@ async def start_api_server():
     venv_python = "venv/bin/python" if os.path.exists("venv/bin/python") else sys.executable
 
     try:
+        # Server output is discarded: pipes nobody reads fill up and block the server's writes
         process = subprocess.Popen([
             venv_python, "src/app.py"
-        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # Stop the server we started once the harness exits
+        atexit.register(process.terminate)
+
+        # Poll /healthz with exponential backoff until the server is up, so a fast
+        # start isn't held to a fixed sleep and a slow one isn't failed too early
+        deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+        delay = 0.05
+        response = None
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get("/healthz", timeout=5.0)
+                if response.status_code == 200:
+                    print("✅ API server started successfully")
+                    return True
+            except httpx.TransportError:
+                pass
 
-        # Wait a bit for server to start
-        await asyncio.sleep(3)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
 
-        # Check if server is responding
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{API_BASE_URL}/healthz")
-            if response.status_code == 200:
-                print("✅ API server started successfully")
-                return True
-            else:
-                print(f"❌ API server not responding properly (status: {response.status_code})")
-                return False
+        if response is not None:
+            print(f"❌ API server not responding properly (status: {response.status_code})")
+        else:
+            print(f"❌ API server did not start within {SERVER_START_TIMEOUT_SECONDS:.0f}s")
+        return False
 
     except Exception as e:
         print(f"❌ Failed to start API server: {e}")
@@ -345,23 +423,27 @@ async def main():
     print("NORMALIZE-BOT API REQUIREMENTS TESTING")
     print("=" * 60)
 
+    if not 1 <= BATCH_SIZE <= MAX_BATCH_ITEMS:
+        print(f"❌ BATCH_SIZE must be between 1 and {MAX_BATCH_ITEMS}, got {BATCH_SIZE}")
+        return
+
     # Test secrets first (doesn't require running server)
-    secrets_pass = test_secrets_requirement()
+    secrets_pass = check_secrets_requirement()
 
-    # Start API server
-    server_started = await start_api_server()
+    async with CLIENT:
+        # Start API server
+        server_started = await start_api_server(CLIENT)
 
-    if not server_started:
-        print("\n❌ Cannot run API tests without server. Please start the API server manually:")
-        print("   cd /Users/ericsingh/Desktop/Fora Travel/normalize-bot")
-        print("   source venv/bin/activate")
-        print("   python src/app.py")
-        return
+        if not server_started:
+            print("\n❌ Cannot run API tests without server. Please start the API server manually:")
+            print("   cd /Users/ericsingh/Desktop/Fora Travel/normalize-bot")
+            print("   source venv/bin/activate")
+            print("   python src/app.py")
+            return
 
-    # Run API tests
-    latency_pass = await test_latency_requirement()
-    stability_pass = await test_stability_requirement()
-    errors_pass = await test_http_errors_requirement()
+        # Run API tests
+        latency_pass, stability_pass = await check_load(CLIENT)
+        errors_pass = await check_http_errors_requirement(CLIENT)
 
     # Summary
     print("\n" + "=" * 60)
@@ -390,4 +472,7 @@ async def main():
     print("=" * 60)
 
 if __name__ == "__main__":
+    # uvloop's event loop cuts per-request loop overhead when firing many concurrent requests
+    if uvloop:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
\ No newline at end of file
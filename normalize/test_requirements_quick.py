@@ -10,6 +10,11 @@ import json
 import httpx
 from dotenv import load_dotenv
 
+try:
+    import uvloop
+except ImportError:  # uvloop isn't available on Windows
+    uvloop = None
+
 load_dotenv()
 
 API_BASE_URL = "http://localhost:8080"
@@ -26,13 +31,13 @@ async def quick_latency_test():
 
     async with httpx.AsyncClient(timeout=30.0) as client:
         for i in range(10):
-            start_time = time.time()
+            start_time = time.perf_counter()
             try:
                 response = await client.post(f"{API_BASE_URL}/normalize", json={
                     "message_id": f"test-{i}",
                     "text": test_message
                 })
-                end_time = time.time()
+                end_time = time.perf_counter()
                 latency = end_time - start_time
                 latencies.append(latency)
 
@@ -42,7 +47,7 @@ async def quick_latency_test():
                 print(f"Request {i+1}: {latency:.2f}s (Status: {response.status_code})")
 
             except Exception as e:
-                end_time = time.time()
+                end_time = time.perf_counter()
                 latency = end_time - start_time
                 latencies.append(latency)
                 print(f"Request {i+1}: {latency:.2f}s (Error: {str(e)})")
@@ -61,7 +66,7 @@ async def quick_latency_test():
         else:
             print(f"  ⚠️  WARNING: Some requests over 20s")
 
-async def test_error_responses():
+async def check_error_responses():
     """Test HTTP error responses have informative JSON."""
     print("\n🔍 TESTING ERROR RESPONSES")
     print("-" * 50)
@@ -108,7 +113,7 @@ async def test_error_responses():
         except Exception as e:
             print(f"Missing field test failed: {e}")
 
-def test_secrets():
+def check_secrets():
     """Test secrets configuration."""
     print("\n🔍 TESTING SECRETS CONFIGURATION")
     print("-" * 50)
@@ -146,7 +151,7 @@ def test_secrets():
 
     return len(issues) == 0 and api_key is not None
 
-async def test_basic_functionality():
+async def check_basic_functionality():
     """Test basic API functionality."""
     print("\n🔍 TESTING BASIC FUNCTIONALITY")
     print("-" * 50)
@@ -205,10 +210,10 @@ async def main():
         print("   python src/app.py")
         return
 
-    await test_basic_functionality()
+    await check_basic_functionality()
     await quick_latency_test()
-    await test_error_responses()
-    secrets_ok = test_secrets()
+    await check_error_responses()
+    secrets_ok = check_secrets()
 
     print("\n" + "=" * 60)
     print("QUICK TEST SUMMARY")
@@ -220,4 +225,7 @@ async def main():
     print("\nNote: Run full stability test (200 requests) separately if needed")
 
 if __name__ == "__main__":
+    # Same event loop as test_requirements.py, so both harnesses measure under the same conditions
+    if uvloop:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
\ No newline at end of file